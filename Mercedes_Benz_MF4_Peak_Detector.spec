@@ -6,13 +6,13 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('app.py', '.'), ('utils', 'utils'), ('.streamlit', '.streamlit')],
-    hiddenimports=['streamlit', 'pandas', 'numpy', 'plotly', 'scipy', 'asammdf', 'openpyxl', 'altair', 'lxml', 'lz4', 'numexpr'],
+    hiddenimports=['streamlit', 'pandas', 'numpy', 'numba', 'plotly', 'scipy', 'sklearn.ensemble', 'asammdf', 'openpyxl', 'xlsxwriter', 'orjson', 'altair', 'lxml', 'lz4', 'numexpr'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter', 'matplotlib', 'IPython', 'jupyter', 'notebook', 'pytest', 'numpy.tests', 'pandas.tests', 'scipy.signal.tests', 'scipy.stats.tests', 'sklearn.tests', 'test', 'lib2to3', 'pydoc_data', 'idlelib', 'turtledemo'],
     noarchive=False,
-    optimize=0,
+    optimize=2,
 )
 pyz = PYZ(a.pure)
 
@@ -26,7 +26,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
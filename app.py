@@ -1,14 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import io
 import traceback
-from utils.mf4_processor import MF4Processor
 from utils.peak_detector import PeakDetector
 from utils.data_exporter import DataExporter
-from utils.anomaly_detector import AnomalyDetector
+from utils.signal_downsampler import SignalDownsampler
 
 # Page configuration
 st.set_page_config(
@@ -27,6 +24,45 @@ if 'selected_signals' not in st.session_state:
     st.session_state.selected_signals = []
 if 'anomaly_results' not in st.session_state:
     st.session_state.anomaly_results = None
+if 'peaks_key' not in st.session_state:
+    st.session_state.peaks_key = None
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_mf4_file(file_id, _uploaded_file):
+    """Process an uploaded MF4 file once per upload; reruns reuse the decoded data"""
+    # Keyed on the upload's file_id, so the file bytes are never hashed or copied;
+    # the decoded arrays are shared read-only rather than unpickled on every rerun
+    # asammdf is only imported once a file is actually uploaded
+    from utils.mf4_processor import MF4Processor
+    return MF4Processor().process_file(_uploaded_file)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def detect_signal_peaks(file_id, selected_signals, peak_params, _data):
+    """Detect peaks, reusing the result while the file, signals and parameters are unchanged"""
+    return PeakDetector().detect_peaks(_data, selected_signals, peak_params)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def detect_signal_anomalies(file_id, selected_signals, peak_params, anomaly_config, _detected_peaks, _data):
+    """Detect anomalies, reusing the result while the peaks and anomaly settings are unchanged"""
+    # The peaks are fully determined by file_id, selected_signals and peak_params
+    from utils.anomaly_detector import AnomalyDetector
+    return AnomalyDetector().detect_peak_anomalies(_detected_peaks, _data, selected_signals, anomaly_config)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_peaks_csv(peaks_key, selected_signals, _detected_peaks, _data):
+    """Serialize detected peaks to CSV once per peak detection result"""
+    return DataExporter().export_to_csv(_detected_peaks, _data, selected_signals)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_peaks_json(peaks_key, selected_signals, _detected_peaks, _data):
+    """Serialize detected peaks to JSON once per peak detection result"""
+    return DataExporter().export_to_json(_detected_peaks, _data, selected_signals)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def downsample_signal_trace(file_id, signal_name, _time_axis, _signal_data):
+    """Downsample a signal's line trace once per file; parameter changes only rebuild the markers"""
+    trace_time, trace_values = SignalDownsampler().downsample(_time_axis, _signal_data)
+    return to_plot_precision(trace_time), to_plot_precision(trace_values)
 
 def main():
     # Custom CSS for Mercedes-Benz styling
@@ -63,44 +99,8 @@ def main():
             help="Select a valid MF4 measurement file"
         )
         
-        # Peak detection parameters
-        st.subheader("🔍 Peak Detection Settings")
-        
-        height_threshold = st.slider(
-            "Height Threshold",
-            min_value=0.1,
-            max_value=10.0,
-            value=1.0,
-            step=0.1,
-            help="Minimum peak height relative to signal standard deviation"
-        )
-        
-        distance = st.slider(
-            "Minimum Distance",
-            min_value=1,
-            max_value=1000,
-            value=100,
-            help="Minimum distance between peaks (samples)"
-        )
-        
-        prominence = st.slider(
-            "Prominence",
-            min_value=0.1,
-            max_value=5.0,
-            value=0.5,
-            step=0.1,
-            help="Required prominence of peaks"
-        )
-        
-        width_range = st.slider(
-            "Peak Width Range",
-            min_value=1,
-            max_value=100,
-            value=(5, 50),
-            help="Minimum and maximum peak width (samples)"
-        )
-        
-        # Anomaly Detection Settings
+        # Anomaly Detection Settings; the toggle and method choice stay outside the form
+        # so the threshold sliders for newly selected methods show up right away
         st.subheader("🚨 Anomaly Detection")
         
         enable_anomaly_detection = st.checkbox(
@@ -116,90 +116,132 @@ def main():
                 default=['statistical', 'zscore'],
                 help="Select anomaly detection methods to apply"
             )
+        
+        # Parameters are collected in a form so moving a slider doesn't rerun the
+        # analysis; values are applied together when the form is submitted
+        with st.form("analysis_params"):
+            # Peak detection parameters
+            st.subheader("🔍 Peak Detection Settings")
             
-            # Show relevant thresholds based on selected methods
-            if anomaly_methods:
-                st.write("**Threshold Settings:**")
-                
-                # Z-Score threshold
-                if 'zscore' in anomaly_methods:
-                    zscore_threshold = st.slider(
-                        "Z-Score Threshold",
-                        min_value=1.5,
-                        max_value=4.0,
-                        value=2.5,
-                        step=0.1,
-                        help="Standard deviations from mean (higher = less sensitive)"
-                    )
+            height_threshold = st.slider(
+                "Height Threshold",
+                min_value=0.1,
+                max_value=10.0,
+                value=1.0,
+                step=0.1,
+                help="Minimum peak height relative to signal standard deviation"
+            )
+            
+            distance = st.slider(
+                "Minimum Distance",
+                min_value=1,
+                max_value=1000,
+                value=100,
+                help="Minimum distance between peaks (samples)"
+            )
+            
+            prominence = st.slider(
+                "Prominence",
+                min_value=0.1,
+                max_value=5.0,
+                value=0.5,
+                step=0.1,
+                help="Required prominence of peaks"
+            )
+            
+            width_range = st.slider(
+                "Peak Width Range",
+                min_value=1,
+                max_value=100,
+                value=(5, 50),
+                help="Minimum and maximum peak width (samples)"
+            )
+            
+            if enable_anomaly_detection:
+                # Show relevant thresholds based on selected methods
+                if anomaly_methods:
+                    st.write("**Anomaly Threshold Settings:**")
+                    
+                    # Z-Score threshold
+                    if 'zscore' in anomaly_methods:
+                        zscore_threshold = st.slider(
+                            "Z-Score Threshold",
+                            min_value=1.5,
+                            max_value=4.0,
+                            value=2.5,
+                            step=0.1,
+                            help="Standard deviations from mean (higher = less sensitive)"
+                        )
+                    else:
+                        zscore_threshold = 2.5
+                    
+                    # Statistical (Modified Z-Score) threshold
+                    if 'statistical' in anomaly_methods:
+                        statistical_threshold = st.slider(
+                            "Modified Z-Score Threshold",
+                            min_value=2.0,
+                            max_value=5.0,
+                            value=3.5,
+                            step=0.1,
+                            help="Median-based outlier detection (higher = less sensitive)"
+                        )
+                    else:
+                        statistical_threshold = 3.5
+                    
+                    # IQR threshold
+                    if 'iqr' in anomaly_methods:
+                        iqr_multiplier = st.slider(
+                            "IQR Multiplier",
+                            min_value=1.0,
+                            max_value=3.0,
+                            value=1.5,
+                            step=0.1,
+                            help="Multiplier for interquartile range (higher = less sensitive)"
+                        )
+                    else:
+                        iqr_multiplier = 1.5
+                    
+                    # Temporal threshold
+                    if 'temporal' in anomaly_methods:
+                        temporal_threshold = st.slider(
+                            "Temporal Anomaly Threshold",
+                            min_value=2.0,
+                            max_value=5.0,
+                            value=3.0,
+                            step=0.1,
+                            help="Threshold for unusual time intervals between peaks"
+                        )
+                    else:
+                        temporal_threshold = 3.0
+                    
+                    # Isolation Forest threshold
+                    if 'isolation_forest' in anomaly_methods:
+                        isolation_percentile = st.slider(
+                            "Isolation Forest Percentile",
+                            min_value=90,
+                            max_value=99,
+                            value=95,
+                            step=1,
+                            help="Percentile threshold for outlier detection (higher = less sensitive)"
+                        )
+                    else:
+                        isolation_percentile = 95
                 else:
+                    # Default values when no methods selected
                     zscore_threshold = 2.5
-                
-                # Statistical (Modified Z-Score) threshold
-                if 'statistical' in anomaly_methods:
-                    statistical_threshold = st.slider(
-                        "Modified Z-Score Threshold",
-                        min_value=2.0,
-                        max_value=5.0,
-                        value=3.5,
-                        step=0.1,
-                        help="Median-based outlier detection (higher = less sensitive)"
-                    )
-                else:
                     statistical_threshold = 3.5
-                
-                # IQR threshold
-                if 'iqr' in anomaly_methods:
-                    iqr_multiplier = st.slider(
-                        "IQR Multiplier",
-                        min_value=1.0,
-                        max_value=3.0,
-                        value=1.5,
-                        step=0.1,
-                        help="Multiplier for interquartile range (higher = less sensitive)"
-                    )
-                else:
                     iqr_multiplier = 1.5
-                
-                # Temporal threshold
-                if 'temporal' in anomaly_methods:
-                    temporal_threshold = st.slider(
-                        "Temporal Anomaly Threshold",
-                        min_value=2.0,
-                        max_value=5.0,
-                        value=3.0,
-                        step=0.1,
-                        help="Threshold for unusual time intervals between peaks"
-                    )
-                else:
                     temporal_threshold = 3.0
-                
-                # Isolation Forest threshold
-                if 'isolation_forest' in anomaly_methods:
-                    isolation_percentile = st.slider(
-                        "Isolation Forest Percentile",
-                        min_value=90,
-                        max_value=99,
-                        value=95,
-                        step=1,
-                        help="Percentile threshold for outlier detection (higher = less sensitive)"
-                    )
-                else:
                     isolation_percentile = 95
-            else:
-                # Default values when no methods selected
-                zscore_threshold = 2.5
-                statistical_threshold = 3.5
-                iqr_multiplier = 1.5
-                temporal_threshold = 3.0
-                isolation_percentile = 95
+            
+            st.form_submit_button("Run Analysis", use_container_width=True)
     
     # Main content area
     if uploaded_file is not None:
         try:
             # Process MF4 file
             with st.spinner("Processing MF4 file..."):
-                processor = MF4Processor()
-                st.session_state.processed_data = processor.process_file(uploaded_file)
+                st.session_state.processed_data = load_mf4_file(uploaded_file.file_id, uploaded_file)
             
             if st.session_state.processed_data is not None:
                 data = st.session_state.processed_data
@@ -230,8 +272,6 @@ def main():
                 
                 if selected_signals:
                     # Peak detection
-                    peak_detector = PeakDetector()
-                    
                     peak_params = {
                         'height_threshold': height_threshold,
                         'distance': distance,
@@ -240,15 +280,16 @@ def main():
                     }
                     
                     with st.spinner("Detecting peaks..."):
-                        st.session_state.detected_peaks = peak_detector.detect_peaks(
-                            data, selected_signals, peak_params
+                        st.session_state.detected_peaks = detect_signal_peaks(
+                            uploaded_file.file_id, selected_signals, peak_params, data
                         )
                     
+                    # Identifies the current peak results for the cached exports
+                    st.session_state.peaks_key = (uploaded_file.file_id, peak_params)
+                    
                     # Anomaly detection
                     if enable_anomaly_detection and anomaly_methods:
                         with st.spinner("Detecting anomalies..."):
-                            anomaly_detector = AnomalyDetector()
-                            
                             anomaly_config = {
                                 'methods': anomaly_methods,
                                 'zscore_threshold': zscore_threshold,
@@ -258,8 +299,9 @@ def main():
                                 'isolation_percentile': isolation_percentile
                             }
                             
-                            st.session_state.anomaly_results = anomaly_detector.detect_peak_anomalies(
-                                st.session_state.detected_peaks, data, selected_signals, anomaly_config
+                            st.session_state.anomaly_results = detect_signal_anomalies(
+                                uploaded_file.file_id, selected_signals, peak_params, anomaly_config,
+                                st.session_state.detected_peaks, data
                             )
                     else:
                         st.session_state.anomaly_results = None
@@ -317,16 +359,27 @@ def main():
             **Sensitivity**: Lower thresholds = more sensitive (detect more anomalies), Higher thresholds = less sensitive (detect fewer, more obvious anomalies)
             """)
 
+def to_plot_precision(values):
+    """Downcast float64 arrays to float32 for charting; halves the payload sent to the browser"""
+    values = np.asarray(values)
+    return values.astype(np.float32) if values.dtype == np.float64 else values
+
 def display_results(data, detected_peaks, selected_signals, anomaly_results=None):
     """Display analysis results with interactive charts and anomaly detection"""
+    # Plotly is only needed once there are results to draw
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     st.subheader("📊 Signal Analysis Results")
     
     # Summary statistics with anomaly information
     total_peaks = sum(len(peaks['indices']) for peaks in detected_peaks.values())
-    total_anomalies = 0
-    if anomaly_results:
-        total_anomalies = sum(len(anomalies['anomalies']) for anomalies in anomaly_results.values())
+    # Anomaly counts per signal, shared by the metrics, summary table and anomaly section
+    anomaly_counts = {
+        name: len(anomaly_results[name]['anomalies']) if anomaly_results and name in anomaly_results else 0
+        for name in selected_signals
+    }
+    total_anomalies = sum(anomaly_counts.values())
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -347,33 +400,49 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
     )
     
     time_axis = data['time']
+    file_id = st.session_state.peaks_key[0]
+    # Peak times are gathered once and shared by the chart and the detailed peak tables;
+    # all signals share the time axis, so one gather over the concatenated indices serves them all
+    peak_signals = [name for name in selected_signals if len(detected_peaks[name]['indices']) > 0]
+    peak_times = {}
+    if peak_signals:
+        peak_index_arrays = [detected_peaks[name]['indices'] for name in peak_signals]
+        all_peak_times = np.take(time_axis, np.concatenate(peak_index_arrays))
+        split_points = np.cumsum([len(indices) for indices in peak_index_arrays[:-1]])
+        peak_times = dict(zip(peak_signals, np.split(all_peak_times, split_points)))
+    
+    # Collect every trace first and add them to the figure in one call; adding
+    # traces one by one re-validates and copies the figure's data each time
+    traces = []
+    trace_rows = []
     
     for i, signal_name in enumerate(selected_signals, 1):
         signal_data = data['signals'][signal_name]
         peaks_info = detected_peaks[signal_name]
         
-        # Plot signal
-        fig.add_trace(
-            go.Scatter(
-                x=time_axis,
-                y=signal_data,
+        # Plot signal, downsampled to a few thousand points and rendered with WebGL;
+        # peak and anomaly markers below still use the exact samples
+        trace_time, trace_values = downsample_signal_trace(file_id, signal_name, time_axis, signal_data)
+        traces.append(
+            go.Scattergl(
+                x=trace_time,
+                y=trace_values,
                 mode='lines',
                 name=f'{signal_name}',
                 line=dict(width=1),
                 showlegend=i==1
-            ),
-            row=i, col=1
+            )
         )
+        trace_rows.append(i)
         
         # Plot detected peaks
         if len(peaks_info['indices']) > 0:
-            peak_times = time_axis[peaks_info['indices']]
-            peak_values = signal_data[peaks_info['indices']]
+            peak_values = np.take(signal_data, peaks_info['indices'])
             
-            fig.add_trace(
-                go.Scatter(
-                    x=peak_times,
-                    y=peak_values,
+            traces.append(
+                go.Scattergl(
+                    x=to_plot_precision(peak_times[signal_name]),
+                    y=to_plot_precision(peak_values),
                     mode='markers',
                     name=f'{signal_name} Peaks',
                     marker=dict(
@@ -382,21 +451,21 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
                         symbol='diamond'
                     ),
                     showlegend=i==1
-                ),
-                row=i, col=1
+                )
             )
+            trace_rows.append(i)
             
             # Plot anomalous peaks if available
             if anomaly_results and signal_name in anomaly_results:
                 anomaly_info = anomaly_results[signal_name]
                 if len(anomaly_info['anomaly_indices']) > 0:
-                    anomaly_peak_times = time_axis[anomaly_info['anomaly_indices']]
-                    anomaly_peak_values = signal_data[anomaly_info['anomaly_indices']]
+                    anomaly_peak_times = np.take(time_axis, anomaly_info['anomaly_indices'])
+                    anomaly_peak_values = np.take(signal_data, anomaly_info['anomaly_indices'])
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=anomaly_peak_times,
-                            y=anomaly_peak_values,
+                    traces.append(
+                        go.Scattergl(
+                            x=to_plot_precision(anomaly_peak_times),
+                            y=to_plot_precision(anomaly_peak_values),
                             mode='markers',
                             name=f'{signal_name} Anomalies',
                             marker=dict(
@@ -406,39 +475,54 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
                                 line=dict(width=2, color='black')
                             ),
                             showlegend=i==1
-                        ),
-                        row=i, col=1
+                        )
                     )
+                    trace_rows.append(i)
+    
+    fig.add_traces(traces, rows=trace_rows, cols=[1] * len(traces))
     
     fig.update_layout(
         height=300 * len(selected_signals),
         title="Signal Analysis with Detected Peaks",
-        xaxis_title="Time (s)" if len(selected_signals) == 1 else None
+        xaxis_title="Time (s)" if len(selected_signals) == 1 else None,
+        # Keep the user's zoom and pan while only the parameters change
+        uirevision=file_id
     )
     
     if len(selected_signals) > 1:
         fig.update_xaxes(title_text="Time (s)", row=len(selected_signals), col=1)
     
-    st.plotly_chart(fig, use_container_width=True)
+    # A fixed key keeps the same chart element across reruns so uirevision can apply
+    st.plotly_chart(fig, use_container_width=True, key="signal_chart")
     
     # Peak statistics table with anomaly information
     st.subheader("📋 Peak Detection Summary")
     
-    summary_data = []
-    for signal_name in selected_signals:
-        peaks_info = detected_peaks[signal_name]
-        anomaly_count = 0
-        if anomaly_results and signal_name in anomaly_results:
-            anomaly_count = len(anomaly_results[signal_name]['anomalies'])
-            
-        summary_data.append({
-            'Signal': signal_name,
-            'Peaks Count': len(peaks_info['indices']),
-            'Anomalous Peaks': anomaly_count,
-            'Avg Height': f"{np.mean(peaks_info['heights']):.3f}" if len(peaks_info['heights']) > 0 else "N/A",
-            'Max Height': f"{np.max(peaks_info['heights']):.3f}" if len(peaks_info['heights']) > 0 else "N/A",
-            'Avg Width': f"{np.mean(peaks_info['widths']):.1f}" if len(peaks_info['widths']) > 0 else "N/A"
-        })
+    # Per-signal aggregates computed in one pass over all peaks, keyed by signal position
+    n_signals = len(selected_signals)
+    peak_counts = np.array([len(detected_peaks[name]['indices']) for name in selected_signals], dtype=np.int64)
+    has_peaks = peak_counts > 0
+    signal_ids = np.repeat(np.arange(n_signals), peak_counts)
+    all_heights = np.concatenate([np.asarray(detected_peaks[name]['heights'], dtype=np.float64) for name in selected_signals])
+    all_widths = np.concatenate([np.asarray(detected_peaks[name]['widths'], dtype=np.float64) for name in selected_signals])
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_heights = np.bincount(signal_ids, weights=all_heights, minlength=n_signals) / peak_counts
+        mean_widths = np.bincount(signal_ids, weights=all_widths, minlength=n_signals) / peak_counts
+    max_heights = np.full(n_signals, np.nan)
+    if has_peaks.any():
+        # Empty signals have zero-length segments, so reducing at the non-empty starts is exact
+        segment_starts = np.concatenate(([0], np.cumsum(peak_counts)[:-1]))
+        max_heights[has_peaks] = np.maximum.reduceat(all_heights, segment_starts[has_peaks])
+    
+    summary_data = {
+        'Signal': selected_signals,
+        'Peaks Count': peak_counts,
+        'Anomalous Peaks': [anomaly_counts[name] for name in selected_signals],
+        'Avg Height': [f"{value:.3f}" if present else "N/A" for value, present in zip(mean_heights, has_peaks)],
+        'Max Height': [f"{value:.3f}" if present else "N/A" for value, present in zip(max_heights, has_peaks)],
+        'Avg Width': [f"{value:.1f}" if present else "N/A" for value, present in zip(mean_widths, has_peaks)]
+    }
     
     summary_df = pd.DataFrame(summary_data)
     st.dataframe(summary_df, use_container_width=True)
@@ -450,8 +534,7 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
     
     with col1:
         if st.button("📄 Export as CSV"):
-            exporter = DataExporter()
-            csv_data = exporter.export_to_csv(detected_peaks, data, selected_signals)
+            csv_data = export_peaks_csv(st.session_state.peaks_key, selected_signals, detected_peaks, data)
             st.download_button(
                 label="Download CSV",
                 data=csv_data,
@@ -461,8 +544,7 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
     
     with col2:
         if st.button("📋 Export as JSON"):
-            exporter = DataExporter()
-            json_data = exporter.export_to_json(detected_peaks, data, selected_signals)
+            json_data = export_peaks_json(st.session_state.peaks_key, selected_signals, detected_peaks, data)
             st.download_button(
                 label="Download JSON",
                 data=json_data,
@@ -475,38 +557,37 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
         st.subheader("🚨 Anomaly Analysis Results")
         
         # Anomaly overview
-        total_signals_with_anomalies = sum(1 for anomalies in anomaly_results.values() if len(anomalies['anomalies']) > 0)
+        total_signals_with_anomalies = sum(1 for count in anomaly_counts.values() if count > 0)
         st.info(f"Found anomalies in {total_signals_with_anomalies} out of {len(selected_signals)} signals")
         
         # Detailed anomaly information per signal
         for signal_name in selected_signals:
-            if signal_name in anomaly_results:
+            if anomaly_counts[signal_name] > 0:
                 anomaly_info = anomaly_results[signal_name]
-                if len(anomaly_info['anomalies']) > 0:
-                    with st.expander(f"🔍 Anomalies in {signal_name} ({len(anomaly_info['anomalies'])} found)"):
-                        
-                        # Anomaly statistics
-                        stats = anomaly_info['statistics']
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Anomaly Rate", f"{stats['anomaly_rate']*100:.1f}%")
-                        with col2:
-                            st.metric("Mean Score", f"{stats['mean_anomaly_score']:.2f}")
-                        with col3:
-                            st.metric("Max Score", f"{stats['max_anomaly_score']:.2f}")
-                        
-                        # Anomaly details table
-                        anomaly_data = []
-                        for anomaly in anomaly_info['anomalies']:
-                            anomaly_data.append({
-                                'Time (s)': f"{anomaly['time']:.3f}",
-                                'Height': f"{anomaly['height']:.3f}",
-                                'Type': anomaly['anomaly_type'],
-                                'Description': anomaly['description']
-                            })
-                        
-                        anomaly_df = pd.DataFrame(anomaly_data)
-                        st.dataframe(anomaly_df, use_container_width=True)
+                with st.expander(f"🔍 Anomalies in {signal_name} ({anomaly_counts[signal_name]} found)"):
+                    
+                    # Anomaly statistics
+                    stats = anomaly_info['statistics']
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Anomaly Rate", f"{stats['anomaly_rate']*100:.1f}%")
+                    with col2:
+                        st.metric("Mean Score", f"{stats['mean_anomaly_score']:.2f}")
+                    with col3:
+                        st.metric("Max Score", f"{stats['max_anomaly_score']:.2f}")
+                    
+                    # Anomaly details table
+                    anomaly_data = []
+                    for anomaly in anomaly_info['anomalies']:
+                        anomaly_data.append({
+                            'Time (s)': f"{anomaly['time']:.3f}",
+                            'Height': f"{anomaly['height']:.3f}",
+                            'Type': anomaly['anomaly_type'],
+                            'Description': anomaly['description']
+                        })
+                    
+                    anomaly_df = pd.DataFrame(anomaly_data)
+                    st.dataframe(anomaly_df, use_container_width=True)
     
     # Detailed peak information
     with st.expander("🔍 Detailed Peak Information"):
@@ -515,15 +596,23 @@ def display_results(data, detected_peaks, selected_signals, anomaly_results=None
             if len(peaks_info['indices']) > 0:
                 st.write(f"**{signal_name}**")
                 
+                # Columns are handed over as arrays; formatting happens in the browser
                 peak_details = pd.DataFrame({
                     'Peak Index': peaks_info['indices'],
-                    'Time (s)': data['time'][peaks_info['indices']],
+                    'Time (s)': peak_times[signal_name],
                     'Height': peaks_info['heights'],
                     'Width': peaks_info['widths'],
                     'Prominence': peaks_info['prominences']
-                })
+                }, copy=False)
                 
-                st.dataframe(peak_details, use_container_width=True)
+                st.dataframe(
+                    peak_details,
+                    use_container_width=True,
+                    column_config={
+                        column: st.column_config.NumberColumn(format='%.3f')
+                        for column in ('Time (s)', 'Height', 'Width', 'Prominence')
+                    }
+                )
             else:
                 st.write(f"**{signal_name}**: No peaks detected")
 
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Server entry point for Mercedes-Benz MF4 Signal Peak Detector
+Serves app.py through Streamlit's ASGI server and loads the analysis stack
+while the server boots, so the first user doesn't wait for it
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from streamlit.starlette import App
+
+def warm_up():
+    """Import the analysis modules so their libraries are loaded before the first session"""
+    # The utils modules compile (or load from Numba's cache) their kernels at import
+    import utils.mf4_processor
+    import utils.peak_detector
+    import utils.anomaly_detector
+    import utils.signal_downsampler
+    
+    # The app imports these lazily on first use
+    import scipy.signal
+    import sklearn.ensemble
+    import plotly.graph_objects
+    import plotly.subplots
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm up before the server starts accepting connections"""
+    await asyncio.to_thread(warm_up)
+    yield
+
+app = App(Path(__file__).parent / "app.py", lifespan=lifespan)
@@ -7,20 +7,49 @@ import os
 import sys
 import subprocess
 import shutil
+from importlib.metadata import version, PackageNotFoundError
 from pathlib import Path
 
-def create_spec_file():
-    """Create PyInstaller spec file for the application"""
-    
-    spec_content = '''
-# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller spec for the one-dir executable
+SPEC_TEMPLATE = '''# -*- mode: python ; coding: utf-8 -*-
+
+import glob
+import os
+import sys
+
+import numpy
+import scipy
+from PyInstaller.utils.hooks import collect_dynamic_libs
 
 block_cipher = None
 
+# UPX-packed binaries are unpacked into memory on every launch instead of being
+# paged in on demand, so packing slows cold start; it is opt-in with UPX=1
+USE_UPX = os.environ.get('UPX', '0') == '1'
+
+def upx_excluded_binaries():
+    """Binaries that stay uncompressed when UPX is enabled: the Python runtime and
+    the large numpy/scipy extension modules and BLAS libraries loaded at startup"""
+    excluded = {
+        f'python{sys.version_info.major}{sys.version_info.minor}.dll',
+        'python3.dll',
+        'vcruntime140.dll',
+        'vcruntime140_1.dll',
+    }
+    for package in (numpy, scipy):
+        package_dir = os.path.dirname(package.__file__)
+        for directory in (package_dir, package_dir + '.libs'):
+            for pattern in ('*.pyd', '*.dll', '*.so'):
+                paths = glob.glob(os.path.join(directory, '**', pattern), recursive=True)
+                excluded.update(os.path.basename(path) for path in paths)
+    return sorted(excluded)
+
 a = Analysis(
     ['app.py'],
     pathex=[],
-    binaries=[],
+    # numpy's and scipy's BLAS and runtime libraries, collected where each package
+    # loads them from so they're bundled exactly once
+    binaries=collect_dynamic_libs('numpy') + collect_dynamic_libs('scipy'),
     datas=[
         ('utils', 'utils'),
         ('.streamlit', '.streamlit'),
@@ -29,46 +58,72 @@ a = Analysis(
         'streamlit',
         'pandas',
         'numpy',
+        'numba',
         'plotly',
         'scipy',
         'asammdf',
         'openpyxl',
+        'orjson',
+        'xlsxwriter',
         'altair',
         'click',
-        'tornado',
         'pyarrow',
         'plotly.graph_objects',
         'plotly.subplots',
         'scipy.signal',
         'scipy.stats',
+        'sklearn.ensemble',
         'streamlit.web.cli',
+        'streamlit.starlette',
+        'starlette',
+        'uvicorn',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=[
+        # GUI, notebook and test tooling that pandas, plotly and numba import
+        # optionally; leaving them out keeps the bundle small and launch fast
+        'tkinter',
+        'matplotlib',
+        'IPython',
+        'jupyter',
+        'notebook',
+        'pytest',
+        'numpy.tests',
+        'pandas.tests',
+        'scipy.signal.tests',
+        'scipy.stats.tests',
+        'sklearn.tests',
+        # Parts of the standard library only used for its own tests and tooling
+        'test',
+        'lib2to3',
+        'pydoc_data',
+        'idlelib',
+        'turtledemo',
+    ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
+    # Bundle bytecode compiled without asserts and docstrings (like python -OO)
+    optimize=2,
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# One-dir build: the executable loads its libraries from the folder next to it
+# instead of unpacking the whole archive to a temp directory on every launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='Mercedes_Benz_MF4_Peak_Detector',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=USE_UPX,
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -77,19 +132,20 @@ exe = EXE(
     entitlements_file=None,
     icon='mercedes_icon.ico'
 )
-'''
-    
-    with open('mercedes_detector.spec', 'w') as f:
-        f.write(spec_content.strip())
-    
-    print("Created PyInstaller spec file: mercedes_detector.spec")
 
-def create_launcher_script():
-    """Create a launcher script that starts Streamlit server"""
-    
-    launcher_content = '''
-import streamlit.web.cli as stcli
-import sys
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=USE_UPX,
+    upx_exclude=upx_excluded_binaries() if USE_UPX else [],
+    name='Mercedes_Benz_MF4_Peak_Detector',
+)'''
+
+# Launcher that starts the Streamlit server from the executable's folder
+LAUNCHER_TEMPLATE = '''import sys
 import os
 from pathlib import Path
 
@@ -112,7 +168,7 @@ def main():
     sys.argv = [
         "streamlit",
         "run",
-        str(app_dir / "app.py"),
+        str(app_dir / "app_server.py"),
         "--server.port=8501",
         "--server.address=127.0.0.1",
         "--browser.serverAddress=127.0.0.1",
@@ -121,66 +177,56 @@ def main():
     ]
     
     print("Starting Mercedes-Benz MF4 Signal Peak Detector...")
-    print("Open your browser and go to: http://localhost:8501")
+    print("Open your browser and go to: http://localhost:8501", flush=True)
+    
+    # Streamlit (and the pandas/numpy/tornado stack behind it) is only imported
+    # now, so the messages above appear as soon as the launcher starts
+    import streamlit.web.cli as stcli
     
     stcli.main()
 
 if __name__ == "__main__":
-    main()
-'''
-    
-    with open('launcher.py', 'w') as f:
-        f.write(launcher_content.strip())
-    
-    print("Created launcher script: launcher.py")
+    main()'''
 
-def create_requirements_file():
-    """Create requirements file for building"""
-    
-    requirements = '''
-streamlit>=1.45.1
+# Dependencies needed to build the executable
+BUILD_REQUIREMENTS = '''streamlit>=1.53.0
 pandas>=2.0.0
 numpy>=1.24.0
+numba>=0.59.0
 plotly>=5.0.0
 scipy>=1.10.0
+scikit-learn>=1.3.0
 asammdf>=8.0.0
 openpyxl>=3.0.0
-pyinstaller>=5.0.0
-altair>=5.0.0
-'''
-    
-    with open('requirements_build.txt', 'w') as f:
-        f.write(requirements.strip())
-    
-    print("Created requirements file: requirements_build.txt")
+orjson>=3.9.0
+xlsxwriter>=3.0.0
+pyinstaller>=6.0.0
+altair>=5.0.0'''
 
-def create_build_batch():
-    """Create batch file for Windows build process"""
-    
-    batch_content = '''@echo off
+# Windows batch file that runs the build
+BUILD_BATCH = '''@echo off
 echo Building Mercedes-Benz MF4 Signal Peak Detector...
 
 echo Installing build dependencies...
 pip install -r requirements_build.txt
 
 echo Creating executable...
+set PYTHONOPTIMIZE=2
 pyinstaller --clean mercedes_detector.spec
 
+echo Packaging application folder...
+powershell -NoProfile -Command "Compress-Archive -Path 'dist\\Mercedes_Benz_MF4_Peak_Detector' -DestinationPath 'dist\\Mercedes_Benz_MF4_Peak_Detector.zip' -Force"
+
 echo Build complete!
-echo Executable location: dist/Mercedes_Benz_MF4_Peak_Detector.exe
+echo Application folder: dist/Mercedes_Benz_MF4_Peak_Detector/
+echo Executable location: dist/Mercedes_Benz_MF4_Peak_Detector/Mercedes_Benz_MF4_Peak_Detector.exe
+echo Distribution archive: dist/Mercedes_Benz_MF4_Peak_Detector.zip
 
 pause
 '''
-    
-    with open('build.bat', 'w') as f:
-        f.write(batch_content)
-    
-    print("Created build batch file: build.bat")
 
-def create_readme():
-    """Create README for the executable"""
-    
-    readme_content = '''# Mercedes-Benz MF4 Signal Peak Detector - Standalone Application
+# README shipped next to the executable
+README_TEMPLATE = '''# Mercedes-Benz MF4 Signal Peak Detector - Standalone Application
 
 ## About
 This is a standalone executable version of the Mercedes-Benz MF4 Signal Peak Detector application.
@@ -201,11 +247,12 @@ and anomaly analysis capabilities.
 - Professional Mercedes-Benz themed interface
 
 ## How to Use
-1. Run Mercedes_Benz_MF4_Peak_Detector.exe
-2. Wait for the application to start (may take 30-60 seconds on first run)
-3. Open your web browser and go to: http://localhost:8501
-4. Upload your MF4 file and configure analysis parameters
-5. View results and export data as needed
+1. Extract Mercedes_Benz_MF4_Peak_Detector.zip and open the Mercedes_Benz_MF4_Peak_Detector folder
+2. Run Mercedes_Benz_MF4_Peak_Detector.exe (keep it next to the other files in the folder)
+3. Wait for the application to start
+4. Open your web browser and go to: http://localhost:8501
+5. Upload your MF4 file and configure analysis parameters
+6. View results and export data as needed
 
 ## System Requirements
 - Windows 10/11 (64-bit)
@@ -226,31 +273,39 @@ For technical support, please contact your system administrator.
 Version: 1.0
 Built with Python, Streamlit, and PyInstaller
 '''
+
+# Files written by build_executable, with the description printed for each
+BUILD_FILES = [
+    ('mercedes_detector.spec', SPEC_TEMPLATE, "PyInstaller spec file"),
+    ('launcher.py', LAUNCHER_TEMPLATE, "launcher script"),
+    ('requirements_build.txt', BUILD_REQUIREMENTS, "requirements file"),
+    ('build.bat', BUILD_BATCH, "build batch file"),
+    ('README_EXECUTABLE.txt', README_TEMPLATE, "README file"),
+]
+
+def write_build_files():
+    """Write the spec, launcher, requirements, batch and README files for the build"""
     
-    with open('README_EXECUTABLE.txt', 'w') as f:
-        f.write(readme_content)
-    
-    print("Created README file: README_EXECUTABLE.txt")
+    for file_name, content, description in BUILD_FILES:
+        with open(file_name, 'w') as f:
+            f.write(content)
+        
+        print(f"Created {description}: {file_name}")
 
 def build_executable():
     """Main build process"""
     
     print("=== Mercedes-Benz MF4 Signal Peak Detector - Executable Builder ===\n")
     
-    # Check if PyInstaller is available
+    # Check if PyInstaller is available; reading its metadata avoids importing the package
     try:
-        import PyInstaller
-        print(f"PyInstaller version: {PyInstaller.__version__}")
-    except ImportError:
+        print(f"PyInstaller version: {version('pyinstaller')}")
+    except PackageNotFoundError:
         print("PyInstaller not found. Installing...")
         subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
     
     # Create build files
-    create_spec_file()
-    create_launcher_script()
-    create_requirements_file()
-    create_build_batch()
-    create_readme()
+    write_build_files()
     
     print("\n=== Build Files Created ===")
     print("1. mercedes_detector.spec - PyInstaller specification")
@@ -263,7 +318,8 @@ def build_executable():
     print("To build the executable:")
     print("1. Run: pip install -r requirements_build.txt")
     print("2. Run: pyinstaller --clean mercedes_detector.spec")
-    print("3. Find executable in: dist/Mercedes_Benz_MF4_Peak_Detector.exe")
+    print("3. Find executable in: dist/Mercedes_Benz_MF4_Peak_Detector/Mercedes_Benz_MF4_Peak_Detector.exe")
+    print("   Distribute the whole dist/Mercedes_Benz_MF4_Peak_Detector/ folder (build.bat zips it)")
     print("\nOr simply run: build.bat (Windows)")
     
     return True
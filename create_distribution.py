@@ -5,20 +5,46 @@ Create distribution packages for Mercedes-Benz MF4 Signal Peak Detector
 
 import os
 import sys
+import subprocess
 import zipfile
 import shutil
+import fnmatch
+import re
+import compileall
+import py_compile
+import io
+import urllib.request
 from pathlib import Path
 
-def create_portable_app():
+# File types that are compressed already and gain nothing from another DEFLATE pass
+PRECOMPRESSED_EXTENSIONS = {'.zip', '.whl', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.gz', '.7z'}
+
+# Target of the bundled wheelhouse used by start_detector.bat
+WHEEL_PLATFORM = "win_amd64"
+WHEEL_PYTHON_VERSION = "3.11"
+
+# Windows embeddable Python bundled with --embed-python; matches the wheelhouse target
+EMBEDDED_PYTHON_URL = "https://www.python.org/ftp/python/3.11.9/python-3.11.9-embed-amd64.zip"
+
+# Numba caches are tied to the machine that wrote them, and VCS/test tooling isn't
+# needed to run the app, so neither is copied or zipped
+EXCLUDED_PATTERNS = ('*.pyo', '*.nbi', '*.nbc', '.git', '.pytest_cache', 'tests', 'test_*.py')
+
+# The source tree's bytecode is not copied; the package's own is compiled after copying
+COPY_IGNORE_PATTERNS = EXCLUDED_PATTERNS + ('__pycache__', '*.pyc')
+
+# Created by the launchers on the machine they run on; never part of the package
+ZIP_IGNORE_PATTERNS = EXCLUDED_PATTERNS + ('.venv', 'installed.flag')
+
+def create_portable_app(embed_python=False):
     """Create a portable Python application package"""
     
     print("Creating portable application package...")
     
-    # Create distribution directory
+    # Create distribution directory; an existing one is updated in place so unchanged
+    # files and the downloaded wheels are kept between runs
     dist_dir = Path("Mercedes_Benz_MF4_Detector_Portable")
-    if dist_dir.exists():
-        shutil.rmtree(dist_dir)
-    dist_dir.mkdir()
+    dist_dir.mkdir(exist_ok=True)
     
     # Copy application files
     files_to_copy = [
@@ -33,9 +59,24 @@ def create_portable_app():
         src = Path(file_path)
         if src.exists():
             if src.is_dir():
-                shutil.copytree(src, dist_dir / src.name)
+                sync_tree(src, dist_dir / src.name)
             else:
-                shutil.copy2(src, dist_dir / src.name)
+                sync_file(src, dist_dir / src.name)
+    
+    # Precompile the package's modules so the first launch doesn't compile them; hash-based
+    # pycs stay valid after extraction, which doesn't preserve source mtimes exactly
+    compileall.compile_dir(
+        str(dist_dir), quiet=1, workers=0,
+        rx=re.compile(r'[\\/](\.venv|python)[\\/]'),
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH
+    )
+    
+    # Bundle the Windows wheels so the first launch installs offline
+    download_wheels(dist_dir)
+    
+    # Optionally bundle Python itself with the packages preinstalled, so nothing is installed at all
+    if embed_python:
+        bundle_embedded_python(dist_dir)
     
     # Create launcher script
     launcher_script = f'''@echo off
@@ -45,9 +86,37 @@ echo Mercedes-Benz MF4 Signal Peak Detector
 echo Professional Vehicle Measurement Analysis
 echo ====================================================
 echo.
-echo Installing required packages...
-pip install -r requirements_build.txt
 
+REM A bundled Python (packaged with --embed-python) has every package installed already
+if exist "%~dp0python\\python.exe" (
+    set PYTHON_EXE=%~dp0python\\python.exe
+    goto :start_app
+)
+
+REM Otherwise packages are installed once into .venv; .venv\\installed.flag marks a completed setup
+if exist .venv\\installed.flag goto :activate
+
+echo Setting up the application environment (first launch only)...
+python -m venv .venv
+call .venv\\Scripts\\activate.bat
+if exist wheels (
+    REM The bundled wheels only fit 64-bit Python {WHEEL_PYTHON_VERSION}; any other Python installs online
+    pip install --no-index --find-links=wheels -r requirements_build.txt || pip install --find-links=wheels -r requirements_build.txt
+) else (
+    pip install -r requirements_build.txt
+)
+if %errorlevel% neq 0 (
+    echo ERROR: Failed to install packages
+    pause
+    exit /b 1
+)
+echo installed> .venv\\installed.flag
+
+:activate
+call .venv\\Scripts\\activate.bat
+set PYTHON_EXE=python
+
+:start_app
 echo.
 echo Starting application...
 echo This may take 30-60 seconds on first launch...
@@ -58,7 +127,7 @@ echo.
 echo To stop the application, close this window or press Ctrl+C
 echo ====================================================
 
-streamlit run app.py --server.port 8501 --browser.gatherUsageStats false
+"%PYTHON_EXE%" -m streamlit run app.py --server.port 8501 --browser.gatherUsageStats false
 
 pause
 '''
@@ -73,8 +142,21 @@ echo "Mercedes-Benz MF4 Signal Peak Detector"
 echo "Professional Vehicle Measurement Analysis"
 echo "===================================================="
 echo ""
-echo "Installing required packages..."
-pip3 install -r requirements_build.txt
+
+# Packages are installed once into .venv; .venv/installed.flag marks a completed setup
+if [ ! -f .venv/installed.flag ]; then
+    echo "Setting up the application environment (first launch only)..."
+    python3 -m venv .venv
+    source .venv/bin/activate
+    # The bundled wheels are used where they match this platform
+    if ! pip install --find-links=wheels -r requirements_build.txt; then
+        echo "ERROR: Failed to install packages"
+        exit 1
+    fi
+    touch .venv/installed.flag
+else
+    source .venv/bin/activate
+fi
 
 echo ""
 echo "Starting application..."
@@ -98,6 +180,129 @@ streamlit run app.py --server.port 8501 --browser.gatherUsageStats false
     print(f"Portable application created in: {dist_dir}")
     return dist_dir
 
+def is_ignored(name, patterns):
+    """Whether a file or folder name matches any of the ignore patterns"""
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+def iter_package_files(directory, arc_prefix):
+    """Yield (path, archive name) for every file under directory that belongs in the package"""
+    
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if is_ignored(entry.name, ZIP_IGNORE_PATTERNS):
+                continue
+            
+            arcname = f"{arc_prefix}/{entry.name}"
+            if entry.is_dir():
+                yield from iter_package_files(entry.path, arcname)
+            else:
+                yield entry.path, arcname
+
+def sync_file(src, dst):
+    """Copy src to dst unless dst is already an up-to-date copy"""
+    
+    if dst.exists():
+        src_stat = src.stat()
+        dst_stat = dst.stat()
+        if dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime >= src_stat.st_mtime:
+            return
+    
+    shutil.copy2(src, dst)
+
+def sync_tree(src, dst):
+    """Mirror the src directory into dst, copying only changed files and removing stale ones"""
+    
+    dst.mkdir(exist_ok=True)
+    
+    kept_names = set()
+    with os.scandir(src) as entries:
+        for entry in entries:
+            if is_ignored(entry.name, COPY_IGNORE_PATTERNS):
+                continue
+            
+            kept_names.add(entry.name)
+            if entry.is_dir():
+                sync_tree(Path(entry.path), dst / entry.name)
+            else:
+                sync_file(Path(entry.path), dst / entry.name)
+    
+    # Remove files and folders whose source no longer exists
+    with os.scandir(dst) as entries:
+        for entry in entries:
+            # Bytecode is compiled in place rather than copied, so it isn't stale
+            if entry.name not in kept_names and entry.name != '__pycache__':
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+
+def download_wheels(dist_dir):
+    """Download the Windows wheels for requirements_build.txt into the bundle"""
+    
+    requirements = Path("requirements_build.txt")
+    if not requirements.exists():
+        print("requirements_build.txt not found; launchers will install packages online")
+        return
+    
+    # pip skips wheels that an earlier run already downloaded into the folder
+    print(f"Downloading wheels for {WHEEL_PLATFORM} / Python {WHEEL_PYTHON_VERSION}...")
+    result = subprocess.run([
+        sys.executable, "-m", "pip", "download",
+        "-r", str(requirements),
+        "-d", str(dist_dir / "wheels"),
+        "--platform", WHEEL_PLATFORM,
+        "--python-version", WHEEL_PYTHON_VERSION,
+        "--only-binary=:all:",
+        "--quiet"
+    ])
+    
+    if result.returncode != 0:
+        # A partial wheelhouse would make the offline install fail, so drop it
+        shutil.rmtree(dist_dir / "wheels", ignore_errors=True)
+        print("Warning: Could not download wheels; launchers will install packages online")
+
+def bundle_embedded_python(dist_dir):
+    """Add a Windows embeddable Python with every requirement preinstalled to the bundle"""
+    
+    python_dir = dist_dir / "python"
+    site_packages = python_dir / "Lib" / "site-packages"
+    
+    if not (python_dir / "python.exe").exists():
+        print(f"Downloading embeddable Python: {EMBEDDED_PYTHON_URL}")
+        try:
+            with urllib.request.urlopen(EMBEDDED_PYTHON_URL) as response:
+                archive = zipfile.ZipFile(io.BytesIO(response.read()))
+        except OSError as e:
+            print(f"Warning: Could not download embeddable Python: {e}")
+            return
+        archive.extractall(python_dir)
+        
+        # The embeddable build ignores site-packages unless its ._pth file lists it
+        for pth_file in python_dir.glob("python*._pth"):
+            lines = pth_file.read_text().splitlines()
+            lines = ["import site" if line.strip() == "#import site" else line for line in lines]
+            lines.insert(lines.index(".") + 1 if "." in lines else len(lines), "Lib\\site-packages")
+            pth_file.write_text("\n".join(lines) + "\n")
+    
+    # The build machine's pip installs the Windows wheels for the embedded interpreter
+    print("Installing packages into the embedded Python...")
+    wheel_source = ["--no-index", "--find-links", str(dist_dir / "wheels")] if (dist_dir / "wheels").exists() else []
+    result = subprocess.run([
+        sys.executable, "-m", "pip", "install",
+        "-r", "requirements_build.txt",
+        "--target", str(site_packages),
+        "--platform", WHEEL_PLATFORM,
+        "--python-version", WHEEL_PYTHON_VERSION,
+        "--only-binary=:all:",
+        "--upgrade",
+        "--quiet"
+    ] + wheel_source)
+    
+    if result.returncode != 0:
+        # Without its packages the bundled Python is useless; the launcher falls back to .venv
+        shutil.rmtree(python_dir, ignore_errors=True)
+        print("Warning: Could not install packages for the embedded Python")
+
 def create_zip_package(dist_dir):
     """Create ZIP package of the portable application"""
     
@@ -105,11 +310,14 @@ def create_zip_package(dist_dir):
     
     print(f"Creating ZIP package: {zip_name}")
     
-    with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(dist_dir):
-            for file in files:
-                file_path = Path(root) / file
-                arcname = file_path.relative_to(dist_dir.parent)
+    # DEFLATE keeps the archive extractable by Windows Explorer; level 9 only costs time
+    # when packaging, while extraction runs at the same speed as for any other level
+    with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+        for file_path, arcname in iter_package_files(dist_dir, dist_dir.name):
+            # Already-compressed files don't shrink further; store them as-is
+            if os.path.splitext(file_path)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+                zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+            else:
                 zipf.write(file_path, arcname)
     
     print(f"ZIP package created: {zip_name}")
@@ -143,7 +351,7 @@ xcopy /s /e /y Mercedes_Benz_MF4_Detector_Portable\\* "%INSTALL_DIR%\\"
 
 echo Creating desktop shortcut...
 set SHORTCUT_PATH=%USERPROFILE%\\Desktop\\Mercedes-Benz MF4 Detector.lnk
-powershell -Command "$WshShell = New-Object -comObject WScript.Shell; $Shortcut = $WshShell.CreateShortcut('%SHORTCUT_PATH%'); $Shortcut.TargetPath = '%INSTALL_DIR%\\start_detector.bat'; $Shortcut.WorkingDirectory = '%INSTALL_DIR%'; $Shortcut.Description = 'Mercedes-Benz MF4 Signal Peak Detector'; $Shortcut.Save()"
+powershell -NoProfile -NonInteractive -Command "$WshShell = New-Object -comObject WScript.Shell; $Shortcut = $WshShell.CreateShortcut('%SHORTCUT_PATH%'); $Shortcut.TargetPath = '%INSTALL_DIR%\\start_detector.bat'; $Shortcut.WorkingDirectory = '%INSTALL_DIR%'; $Shortcut.Description = 'Mercedes-Benz MF4 Signal Peak Detector'; $Shortcut.Save()"
 
 echo.
 echo ====================================================
@@ -172,7 +380,7 @@ def create_user_guide():
 
 ## System Requirements
 - Windows 10/11, macOS 10.14+, or Linux
-- Python 3.8 or later
+- Python 3.10 or later (Python 3.11, 64-bit, installs offline from the bundled wheels on Windows)
 - 4GB RAM (8GB recommended for large files)
 - 2GB free disk space
 - Web browser (Chrome, Firefox, Safari, Edge)
@@ -185,13 +393,13 @@ def create_user_guide():
 3. Wait for browser to open automatically
 
 ### Option 2: Manual Installation
-1. Install Python 3.8+ from python.org
+1. Install Python 3.10+ from python.org
 2. Extract application files
 3. Run: pip install -r requirements_build.txt
 4. Run: streamlit run app.py
 
 ### Option 3: Standalone Executable (if available)
-1. Run Mercedes_Benz_MF4_Peak_Detector.exe
+1. Open the Mercedes_Benz_MF4_Peak_Detector folder and run Mercedes_Benz_MF4_Peak_Detector.exe
 2. Wait for browser to open at http://localhost:8501
 
 ## Using the Application
@@ -334,7 +542,8 @@ def main():
     
     try:
         # Create portable application
-        dist_dir = create_portable_app()
+        # --embed-python bundles a Windows Python with the packages preinstalled
+        dist_dir = create_portable_app(embed_python="--embed-python" in sys.argv)
         
         # Create ZIP package
         zip_file = create_zip_package(dist_dir)
@@ -5,12 +5,44 @@ This creates a truly self-contained executable that doesn't require Python insta
 """
 
 import os
+import io
+import fnmatch
 import sys
+import asyncio
+import tempfile
+import subprocess
+import compileall
+import py_compile
 import urllib.request
 import zipfile
 import shutil
 from pathlib import Path
 
+# Windows embeddable Python shipped in the python/ folder, and the target its packages are installed for
+EMBEDDED_PYTHON_URL = "https://www.python.org/ftp/python/3.11.9/python-3.11.9-embed-amd64.zip"
+EMBEDDED_PYTHON_PLATFORM = "win_amd64"
+EMBEDDED_PYTHON_VERSION = "3.11"
+
+# pip options that select wheels for the embedded interpreter instead of the build Python
+EMBEDDED_WHEEL_OPTIONS = [
+    "--platform", EMBEDDED_PYTHON_PLATFORM,
+    "--python-version", EMBEDDED_PYTHON_VERSION,
+    "--only-binary=:all:"
+]
+
+# File types that are compressed already and gain nothing from another DEFLATE pass
+PRECOMPRESSED_EXTENSIONS = {'.zip', '.whl', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.gz', '.7z'}
+
+# Folders removed from the embedded site-packages (glob patterns relative to it): the
+# packages' own test suites and asammdf's Qt GUI, none of which the app imports
+PRUNE_PATTERNS = ["**/tests", "asammdf/gui"]
+
+# The source tree's bytecode and Numba caches are not copied; the package's own is compiled after copying
+COPY_IGNORE_PATTERNS = ('__pycache__', '*.pyc', '*.pyo', '*.nbi', '*.nbc')
+
+# Created by the launcher on the machine it runs on; never part of the package
+ZIP_IGNORE_PATTERNS = ('.git', 'pip_cache')
+
 def create_embedded_python_app():
     """Create application with embedded Python"""
     
@@ -28,26 +60,38 @@ def create_embedded_python_app():
         src = Path(file_path)
         if src.exists():
             if src.is_dir():
-                shutil.copytree(src, dist_dir / src.name)
+                shutil.copytree(src, dist_dir / src.name, ignore=shutil.ignore_patterns(*COPY_IGNORE_PATTERNS))
             else:
                 shutil.copy2(src, dist_dir / src.name)
     
+    # Precompile the app's modules at the optimization level the launcher runs with
+    compileall.compile_dir(
+        str(dist_dir / "utils"), quiet=1, optimize=2,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH
+    )
+    
     # Create requirements file with exact versions
     requirements_content = """streamlit==1.45.1
 pandas==2.3.0
 numpy==2.3.0
+numba==0.62.0
 plotly==6.1.2
 scipy==1.15.3
+scikit-learn==1.7.0
 asammdf==8.5.0
 openpyxl==3.1.5
+orjson==3.10.18
+xlsxwriter==3.2.5
 altair==5.5.0
 lxml==5.4.0
 lz4==4.4.4
 numexpr==2.11.0
 """
     
-    with open(dist_dir / "requirements.txt", "w") as f:
-        f.write(requirements_content)
+    write_if_changed(dist_dir / "requirements.txt", requirements_content)
+    
+    # Bundle Python with every package preinstalled, so the first launch installs nothing
+    bundle_embedded_python(dist_dir)
     
     # Create advanced launcher with embedded Python check
     launcher_content = """@echo off
@@ -64,10 +108,15 @@ set PYTHON_DIR=%~dp0python
 set PYTHON_EXE=%PYTHON_DIR%\\python.exe
 set SCRIPTS_DIR=%PYTHON_DIR%\\Scripts
 
+REM Run without asserts and docstrings; the shipped bytecode is compiled for this level
+set PYTHONOPTIMIZE=2
+
 REM Check for embedded Python first
 if exist "%PYTHON_EXE%" (
     echo Using embedded Python...
     set PATH=%PYTHON_DIR%;%SCRIPTS_DIR%;%PATH%
+    REM Packages are preinstalled into the embedded Python when the package is built
+    if exist "%PYTHON_DIR%\\Lib\\site-packages" goto :start_app
     goto :install_packages
 )
 
@@ -94,7 +143,13 @@ exit /b 1
 
 :install_packages
 echo Installing/updating required packages...
-"%PYTHON_EXE%" -m pip install --upgrade pip --quiet --disable-pip-version-check
+REM Keep pip's download and built-wheel cache with the application; the per-user
+REM cache may be missing or cleared by policy on managed machines
+set PIP_CACHE_DIR=%~dp0pip_cache
+REM Upgrade pip only when it is older than 23, the version bundled with Python 3.11
+set PIP_VER=
+for /f "tokens=2" %%V in ('"%PYTHON_EXE%" -m pip --version 2^>nul') do set PIP_VER=%%V
+echo %PIP_VER% | findstr /B "2[3-9]\\. [3-9][0-9]\\." >nul || "%PYTHON_EXE%" -m pip install --upgrade pip --quiet --disable-pip-version-check
 "%PYTHON_EXE%" -m pip install -r requirements.txt --quiet --disable-pip-version-check
 
 if %errorlevel% neq 0 (
@@ -106,6 +161,7 @@ if %errorlevel% neq 0 (
     exit /b 1
 )
 
+:start_app
 echo.
 echo Starting Mercedes-Benz MF4 Signal Peak Detector...
 echo.
@@ -121,11 +177,148 @@ start "" "http://localhost:8501"
 pause
 """
     
-    with open(dist_dir / "Mercedes_Benz_MF4_Detector.bat", "w") as f:
-        f.write(launcher_content)
+    write_if_changed(dist_dir / "Mercedes_Benz_MF4_Detector.bat", launcher_content)
     
     return dist_dir
 
+def bundle_embedded_python(dist_dir):
+    """Download the embeddable Python into dist_dir/python and preinstall the requirements"""
+    
+    python_dir = dist_dir / "python"
+    site_packages = python_dir / "Lib" / "site-packages"
+    
+    print(f"Downloading embeddable Python: {EMBEDDED_PYTHON_URL}")
+    try:
+        with urllib.request.urlopen(EMBEDDED_PYTHON_URL) as response:
+            archive = zipfile.ZipFile(io.BytesIO(response.read()))
+    except OSError as e:
+        print(f"Warning: Could not download embeddable Python ({e}); the launcher will use system Python")
+        return
+    archive.extractall(python_dir)
+    
+    # The embeddable build ignores site-packages unless its ._pth file lists it
+    for pth_file in python_dir.glob("python*._pth"):
+        lines = pth_file.read_text().splitlines()
+        lines = ["import site" if line.strip() == "#import site" else line for line in lines]
+        lines.insert(lines.index(".") + 1 if "." in lines else len(lines), "Lib\\site-packages")
+        pth_file.write_text("\n".join(lines) + "\n")
+    
+    # The build machine's pip installs the Windows wheels for the embedded interpreter
+    requirements_file = dist_dir / "requirements.txt"
+    with tempfile.TemporaryDirectory() as wheels_dir:
+        print("Downloading packages for the embedded Python...")
+        installed = build_wheelhouse(requirements_file, Path(wheels_dir))
+        if installed:
+            print("Installing packages into the embedded Python...")
+            result = subprocess.run([
+                sys.executable, "-m", "pip", "install",
+                "-r", str(requirements_file),
+                "--target", str(site_packages),
+                "--no-index", "--find-links", wheels_dir,
+                *EMBEDDED_WHEEL_OPTIONS,
+                "--quiet"
+            ])
+            installed = result.returncode == 0
+    if not installed:
+        # Without its packages the bundled Python is useless; the launcher falls back to system Python
+        shutil.rmtree(python_dir, ignore_errors=True)
+        print("Warning: Could not install packages for the embedded Python")
+        return
+    
+    prune_site_packages(site_packages)
+    
+    # pycs are tagged with the compiling interpreter's version, so only a matching build
+    # Python can precompile for the embedded one
+    if f"{sys.version_info.major}.{sys.version_info.minor}" != EMBEDDED_PYTHON_VERSION:
+        print(f"Skipping precompilation: build Python is not {EMBEDDED_PYTHON_VERSION}")
+        return
+    
+    # Precompile site-packages (at the launcher's PYTHONOPTIMIZE level) so the first launch
+    # doesn't compile every imported module; hash-based pycs stay valid after the package
+    # is zipped and extracted. Sources stay: Numba compiles kernels from them
+    print("Precompiling packages...")
+    compileall.compile_dir(
+        str(site_packages), quiet=1, workers=0, optimize=2,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH
+    )
+
+async def download_wheel(requirement, wheels_dir):
+    """Download the wheel for one requirement, without its dependencies"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "pip", "download", requirement,
+        "--no-deps", "-d", str(wheels_dir), *EMBEDDED_WHEEL_OPTIONS, "--quiet",
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    return await process.wait()
+
+async def download_wheels(requirements, wheels_dir):
+    """Download the wheels for all requirements concurrently"""
+    return await asyncio.gather(*(download_wheel(requirement, wheels_dir) for requirement in requirements))
+
+def build_wheelhouse(requirements_file, wheels_dir):
+    """Download the wheels for requirements_file and their dependencies into wheels_dir"""
+    
+    requirements = [
+        line.strip() for line in requirements_file.read_text().splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+    
+    # The listed packages download in parallel; each is a separate PyPI round-trip
+    asyncio.run(download_wheels(requirements, wheels_dir))
+    
+    # One resolver pass adds the transitive dependencies and retries anything that failed
+    # above, reusing the wheels already in wheels_dir
+    result = subprocess.run([
+        sys.executable, "-m", "pip", "download",
+        "-r", str(requirements_file),
+        "-d", str(wheels_dir),
+        *EMBEDDED_WHEEL_OPTIONS,
+        "--quiet"
+    ])
+    return result.returncode == 0
+
+def prune_site_packages(site_packages):
+    """Remove the folders matched by PRUNE_PATTERNS from an installed site-packages"""
+    
+    pruned = set()
+    for pattern in PRUNE_PATTERNS:
+        for path in sorted(site_packages.glob(pattern)):
+            # Skip folders nested in one that was already removed
+            if path.is_dir() and not any(parent in pruned for parent in path.parents):
+                shutil.rmtree(path, ignore_errors=True)
+                pruned.add(path)
+    
+    print(f"Pruned {len(pruned)} unused folders from site-packages")
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds exactly that; returns whether it wrote"""
+    
+    path = Path(path)
+    if path.exists() and path.read_text() == content:
+        return False
+    
+    path.write_text(content)
+    return True
+
+def is_ignored(name, patterns):
+    """Whether a file or folder name matches any of the ignore patterns"""
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+def iter_package_files(directory, arc_prefix):
+    """Yield (path, archive name) for every file under directory that belongs in the package"""
+    
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if is_ignored(entry.name, ZIP_IGNORE_PATTERNS):
+                continue
+            
+            arcname = f"{arc_prefix}/{entry.name}"
+            if entry.is_dir():
+                yield from iter_package_files(entry.path, arcname)
+            else:
+                yield entry.path, arcname
+
 def create_installation_guide():
     """Create detailed installation guide"""
     
@@ -290,104 +483,18 @@ Mercedes-Benz MF4 Signal Peak Detector v1.0
 Professional Vehicle Measurement Analysis Tool
 """
     
-    with open("Installation_Guide.md", "w") as f:
-        f.write(guide_content)
+    write_if_changed("Installation_Guide.md", guide_content)
     
     print("Installation guide created: Installation_Guide.md")
 
 def create_simple_exe_alternative():
-    """Create a simple Python script that can be converted to EXE"""
-    
-    simple_app_content = """#!/usr/bin/env python3
-'''
-Simple launcher for Mercedes-Benz MF4 Signal Peak Detector
-This version is designed to be converted to EXE with auto-py-to-exe
-'''
-
-import subprocess
-import sys
-import os
-import webbrowser
-import time
-import threading
-from pathlib import Path
-
-def install_requirements():
-    '''Install required packages'''
-    requirements = [
-        'streamlit==1.45.1',
-        'pandas==2.3.0', 
-        'numpy==2.3.0',
-        'plotly==6.1.2',
-        'scipy==1.15.3',
-        'asammdf==8.5.0',
-        'openpyxl==3.1.5'
-    ]
+    """Check for the simple launcher script that can be converted to EXE"""
     
-    print("Installing required packages...")
-    for package in requirements:
-        try:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package, '--quiet'])
-        except subprocess.CalledProcessError:
-            print(f"Warning: Could not install {package}")
-
-def open_browser():
-    '''Open browser after delay'''
-    time.sleep(5)
-    webbrowser.open('http://localhost:8501')
-
-def main():
-    print("=" * 60)
-    print("Mercedes-Benz MF4 Signal Peak Detector")
-    print("Professional Vehicle Measurement Analysis")
-    print("=" * 60)
-    
-    # Install requirements
-    install_requirements()
+    # simple_launcher.py lives in the repository, so there is a single copy to maintain
+    if not Path("simple_launcher.py").exists():
+        raise FileNotFoundError("simple_launcher.py not found; run this script from the project folder")
     
-    # Start browser thread
-    browser_thread = threading.Thread(target=open_browser, daemon=True)
-    browser_thread.start()
-    
-    # Get app directory
-    if getattr(sys, 'frozen', False):
-        app_dir = Path(sys.executable).parent
-    else:
-        app_dir = Path(__file__).parent
-    
-    app_file = app_dir / 'app.py'
-    
-    if not app_file.exists():
-        print(f"Error: app.py not found in {app_dir}")
-        input("Press Enter to exit...")
-        return
-    
-    print("Starting application server...")
-    print("Browser will open automatically at http://localhost:8501")
-    print("To stop: Close this window")
-    
-    # Start Streamlit
-    try:
-        subprocess.run([
-            sys.executable, '-m', 'streamlit', 'run', str(app_file),
-            '--server.port', '8501',
-            '--browser.gatherUsageStats', 'false',
-            '--server.headless', 'true'
-        ])
-    except KeyboardInterrupt:
-        print("Application stopped by user")
-    except Exception as e:
-        print(f"Error: {e}")
-        input("Press Enter to exit...")
-
-if __name__ == '__main__':
-    main()
-"""
-    
-    with open("simple_launcher.py", "w") as f:
-        f.write(simple_app_content)
-    
-    print("Simple launcher created: simple_launcher.py")
+    print("Simple launcher found: simple_launcher.py")
 
 def main():
     """Create comprehensive distribution packages"""
@@ -406,10 +513,11 @@ def main():
     # Create updated ZIP package
     zip_name = "Mercedes_Benz_MF4_Detector_Complete.zip"
     with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(dist_dir):
-            for file in files:
-                file_path = Path(root) / file
-                arcname = file_path.relative_to(dist_dir.parent)
+        for file_path, arcname in iter_package_files(dist_dir, dist_dir.name):
+            # The embedded Python's stdlib zip and any wheels are stored as-is
+            if os.path.splitext(file_path)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+                zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+            else:
                 zipf.write(file_path, arcname)
         
         # Add documentation
@@ -433,6 +541,8 @@ def main():
     print(f"1. Install auto-py-to-exe: pip install auto-py-to-exe")
     print(f"2. Run: auto-py-to-exe simple_launcher.py")
     print(f"3. Configure as one-file executable")
+    print(f"4. Optional, for offline installs: pip wheel -r {dist_dir}/requirements.txt -w wheels")
+    print(f"   and ship the wheels folder next to the executable")
     
     return True
 
@@ -4,10 +4,42 @@ Create final distribution package with improved launcher
 """
 
 import os
+import fnmatch
 import zipfile
 import shutil
 from pathlib import Path
 
+# Created by the launcher on the machine it runs on; never part of the package
+ZIP_IGNORE_PATTERNS = ('.git', 'pip_cache', '.last_python', 'setup.log')
+
+def is_ignored(name, patterns):
+    """Whether a file or folder name matches any of the ignore patterns"""
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+def iter_package_files(directory, arc_prefix):
+    """Yield (path, archive name) for every file under directory that belongs in the package"""
+    
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if is_ignored(entry.name, ZIP_IGNORE_PATTERNS):
+                continue
+            
+            arcname = f"{arc_prefix}/{entry.name}"
+            if entry.is_dir():
+                yield from iter_package_files(entry.path, arcname)
+            else:
+                yield entry.path, arcname
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds exactly that; returns whether it wrote"""
+    
+    path = Path(path)
+    if path.exists() and path.read_text() == content:
+        return False
+    
+    path.write_text(content)
+    return True
+
 def create_final_package():
     """Create the final distribution package"""
     
@@ -25,8 +57,27 @@ echo    Professional Vehicle Measurement Analysis
 echo =====================================================
 echo.
 
-REM Create log file for debugging
 set LOG_FILE=%~dp0setup.log
+set LAST_PYTHON_FILE=%~dp0.last_python
+
+REM Run without asserts and docstrings; the shipped bytecode is compiled for this level
+set PYTHONOPTIMIZE=2
+
+REM Use the bundled Python when present; its packages are preinstalled at build time
+if exist "%~dp0python\\python.exe" if exist "%~dp0python\\Lib\\site-packages" (
+    set "PYTHON_EXE=%~dp0python\\python.exe"
+    echo Using bundled Python...
+    goto :start_application
+)
+
+REM Reuse the Python that completed setup on a previous launch
+if not exist "%LAST_PYTHON_FILE%" goto :first_launch
+set /p PYTHON_EXE=<"%LAST_PYTHON_FILE%"
+"%PYTHON_EXE%" --version >nul 2>&1
+if %errorlevel% equ 0 goto :start_application
+
+:first_launch
+REM Create log file for debugging
 echo Installation started at %date% %time% > "%LOG_FILE%"
 
 echo Checking system requirements...
@@ -54,18 +105,15 @@ if %errorlevel% equ 0 (
     goto :install_packages
 )
 
-REM Method 2: Check common installation paths
-for %%P in (
-    "%LOCALAPPDATA%\\Programs\\Python\\Python*\\python.exe"
-    "%ProgramFiles%\\Python*\\python.exe"
-    "%ProgramFiles(x86)%\\Python*\\python.exe"
-    "%USERPROFILE%\\AppData\\Local\\Programs\\Python\\Python*\\python.exe"
-) do (
-    if exist "%%P" (
-        set PYTHON_EXE=%%P
-        set PYTHON_FOUND=1
-        echo Found Python at %%P
-        goto :install_packages
+REM Method 2: Look up registered installations (per-user first, then machine-wide)
+for %%K in (HKCU HKLM) do (
+    for /f "tokens=2*" %%A in ('reg query "%%K\\Software\\Python\\PythonCore" /s /v ExecutablePath 2^>nul ^| findstr ExecutablePath') do (
+        if exist "%%B" (
+            set "PYTHON_EXE=%%B"
+            set PYTHON_FOUND=1
+            echo Found Python at %%B
+            goto :install_packages
+        )
     )
 )
 
@@ -84,7 +132,7 @@ echo =====================================================
 echo ERROR: Python not found on this system
 echo =====================================================
 echo.
-echo This application requires Python 3.8 or later.
+echo This application requires Python 3.11 or later.
 echo.
 echo SOLUTION:
 echo 1. Download Python from: https://python.org/downloads/
@@ -104,37 +152,32 @@ echo Installing required packages (this may take 2-3 minutes)...
 echo Please wait - downloading Mercedes-Benz MF4 analysis tools...
 echo.
 
-REM Upgrade pip first
-echo Updating package installer... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install --upgrade pip --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
-
-REM Install packages with better error handling
-echo Installing Streamlit framework... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install streamlit --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
-if %errorlevel% neq 0 goto :install_error
+REM Skip pip entirely when this Python already has every package
+"%PYTHON_EXE%" -c "import streamlit, pandas, numpy, numba, plotly, scipy, sklearn, asammdf, openpyxl, xlsxwriter, orjson" 2>nul
+if %errorlevel% equ 0 goto :setup_complete
 
-echo Installing data analysis libraries... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install pandas numpy --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
-if %errorlevel% neq 0 goto :install_error
-
-echo Installing visualization tools... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install plotly --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
-if %errorlevel% neq 0 goto :install_error
+REM Keep pip's download and built-wheel cache with the application; the per-user
+REM cache may be missing or cleared by policy on managed machines
+set PIP_CACHE_DIR=%~dp0pip_cache
 
-echo Installing signal processing... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install scipy --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
-if %errorlevel% neq 0 goto :install_error
-
-echo Installing MF4 file processor... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install asammdf --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
-if %errorlevel% neq 0 goto :install_error
+echo Updating package installer... >> "%LOG_FILE%"
+REM Upgrade pip only when it is older than 23, the version bundled with Python 3.11
+set PIP_VER=
+for /f "tokens=2" %%V in ('"%PYTHON_EXE%" -m pip --version 2^>nul') do set PIP_VER=%%V
+echo %PIP_VER% | findstr /B "2[3-9]\\. [3-9][0-9]\\." >nul || "%PYTHON_EXE%" -m pip install --upgrade pip --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
 
-echo Installing Excel export... >> "%LOG_FILE%"
-"%PYTHON_EXE%" -m pip install openpyxl --quiet --disable-pip-version-check 2>> "%LOG_FILE%"
+REM Install all packages in one resolver pass, preferring wheels over source builds; the
+REM pins are the ones create_embedded_distribution.py installed into the bundled Python
+echo Installing required packages... >> "%LOG_FILE%"
+"%PYTHON_EXE%" -m pip install -r "%~dp0requirements.txt" --quiet --disable-pip-version-check --prefer-binary 2>> "%LOG_FILE%"
 if %errorlevel% neq 0 goto :install_error
 
+:setup_complete
 echo Setup completed successfully >> "%LOG_FILE%"
 
+REM Remember this Python so later launches skip detection and setup
+(echo %PYTHON_EXE%)> "%LAST_PYTHON_FILE%"
+
 goto :start_application
 
 :install_error
@@ -193,29 +236,33 @@ if %errorlevel% neq 0 (
 '''
     
     # Update the launcher in the self-contained directory
+    # Unchanged files keep their timestamps, so an unchanged package isn't zipped again
     launcher_path = Path("Mercedes_Benz_MF4_Detector_SelfContained/Mercedes_Benz_MF4_Detector.bat")
-    with open(launcher_path, "w") as f:
-        f.write(improved_launcher)
+    write_if_changed(launcher_path, improved_launcher)
     
     # Create comprehensive ZIP package
     zip_name = "Mercedes_Benz_MF4_Detector_FINAL.zip"
+    dist_dir = Path("Mercedes_Benz_MF4_Detector_SelfContained")
+    package_files = list(iter_package_files(dist_dir, dist_dir.name))
+    docs = [doc for doc in ["Installation_Guide.md", "EXE_Creation_Instructions.md", "User_Guide.md"] if Path(doc).exists()]
+    
+    if Path(zip_name).exists():
+        zip_mtime = os.path.getmtime(zip_name)
+        sources = [file_path for file_path, _ in package_files] + docs
+        if all(os.path.getmtime(source) <= zip_mtime for source in sources):
+            print(f"Final package is up to date: {zip_name}")
+            return zip_name
     
     print(f"Creating final ZIP package: {zip_name}")
     
     with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
         # Add self-contained version
-        dist_dir = Path("Mercedes_Benz_MF4_Detector_SelfContained")
-        for root, dirs, files in os.walk(dist_dir):
-            for file in files:
-                file_path = Path(root) / file
-                arcname = file_path.relative_to(dist_dir.parent)
-                zipf.write(file_path, arcname)
+        for file_path, arcname in package_files:
+            zipf.write(file_path, arcname)
         
         # Add documentation
-        docs = ["Installation_Guide.md", "EXE_Creation_Instructions.md", "User_Guide.md"]
         for doc in docs:
-            if Path(doc).exists():
-                zipf.write(doc)
+            zipf.write(doc)
     
     print(f"Final package created: {zip_name}")
     return zip_name
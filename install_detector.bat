@@ -23,7 +23,7 @@ xcopy /s /e /y Mercedes_Benz_MF4_Detector_Portable\* "%INSTALL_DIR%\"
 
 echo Creating desktop shortcut...
 set SHORTCUT_PATH=%USERPROFILE%\Desktop\Mercedes-Benz MF4 Detector.lnk
-powershell -Command "$WshShell = New-Object -comObject WScript.Shell; $Shortcut = $WshShell.CreateShortcut('%SHORTCUT_PATH%'); $Shortcut.TargetPath = '%INSTALL_DIR%\start_detector.bat'; $Shortcut.WorkingDirectory = '%INSTALL_DIR%'; $Shortcut.Description = 'Mercedes-Benz MF4 Signal Peak Detector'; $Shortcut.Save()"
+powershell -NoProfile -NonInteractive -Command "$WshShell = New-Object -comObject WScript.Shell; $Shortcut = $WshShell.CreateShortcut('%SHORTCUT_PATH%'); $Shortcut.TargetPath = '%INSTALL_DIR%\start_detector.bat'; $Shortcut.WorkingDirectory = '%INSTALL_DIR%'; $Shortcut.Description = 'Mercedes-Benz MF4 Signal Peak Detector'; $Shortcut.Save()"
 
 echo.
 echo ====================================================
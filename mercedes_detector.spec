@@ -1,11 +1,42 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import glob
+import os
+import sys
+
+import numpy
+import scipy
+from PyInstaller.utils.hooks import collect_dynamic_libs
+
 block_cipher = None
 
+# UPX-packed binaries are unpacked into memory on every launch instead of being
+# paged in on demand, so packing slows cold start; it is opt-in with UPX=1
+USE_UPX = os.environ.get('UPX', '0') == '1'
+
+def upx_excluded_binaries():
+    """Binaries that stay uncompressed when UPX is enabled: the Python runtime and
+    the large numpy/scipy extension modules and BLAS libraries loaded at startup"""
+    excluded = {
+        f'python{sys.version_info.major}{sys.version_info.minor}.dll',
+        'python3.dll',
+        'vcruntime140.dll',
+        'vcruntime140_1.dll',
+    }
+    for package in (numpy, scipy):
+        package_dir = os.path.dirname(package.__file__)
+        for directory in (package_dir, package_dir + '.libs'):
+            for pattern in ('*.pyd', '*.dll', '*.so'):
+                paths = glob.glob(os.path.join(directory, '**', pattern), recursive=True)
+                excluded.update(os.path.basename(path) for path in paths)
+    return sorted(excluded)
+
 a = Analysis(
     ['standalone_app.py'],
     pathex=[],
-    binaries=[],
+    # numpy's and scipy's BLAS and runtime libraries, collected where each package
+    # loads them from so they're bundled exactly once
+    binaries=collect_dynamic_libs('numpy') + collect_dynamic_libs('scipy'),
     datas=[
         ('utils', 'utils'),
         ('.streamlit', '.streamlit'),
@@ -14,19 +45,25 @@ a = Analysis(
         'streamlit',
         'pandas',
         'numpy',
+        'numba',
         'plotly',
         'scipy',
         'asammdf',
         'openpyxl',
+        'orjson',
+        'xlsxwriter',
         'altair',
         'click',
-        'tornado',
         'pyarrow',
         'plotly.graph_objects',
         'plotly.subplots',
         'scipy.signal',
         'scipy.stats',
+        'sklearn.ensemble',
         'streamlit.web.cli',
+        'streamlit.starlette',
+        'starlette',
+        'uvicorn',
         'streamlit.runtime.scriptrunner.script_runner',
         'streamlit.runtime.state',
         'canmatrix',
@@ -38,33 +75,64 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=[
+        # GUI, notebook and test tooling that pandas, plotly and numba import
+        # optionally; leaving them out keeps the bundle small and launch fast
+        'tkinter',
+        'matplotlib',
+        'IPython',
+        'jupyter',
+        'notebook',
+        'pytest',
+        'numpy.tests',
+        'pandas.tests',
+        'scipy.signal.tests',
+        'scipy.stats.tests',
+        'sklearn.tests',
+        # Parts of the standard library only used for its own tests and tooling
+        'test',
+        'lib2to3',
+        'pydoc_data',
+        'idlelib',
+        'turtledemo',
+    ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
+    # Bundle bytecode compiled without asserts and docstrings (like python -OO)
+    optimize=2,
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# One-dir build: the executable loads its libraries from the folder next to it
+# instead of unpacking the whole archive to a temp directory on every launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='Mercedes_Benz_MF4_Peak_Detector',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=USE_UPX,
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=USE_UPX,
+    upx_exclude=upx_excluded_binaries() if USE_UPX else [],
+    name='Mercedes_Benz_MF4_Peak_Detector',
 )
\ No newline at end of file
@@ -7,34 +7,77 @@ This version is designed to be converted to EXE with auto-py-to-exe
 import subprocess
 import sys
 import os
-import webbrowser
+import socket
+import importlib
+import multiprocessing
 import time
 import threading
+from importlib.metadata import version, PackageNotFoundError
 from pathlib import Path
 
-def install_requirements():
-    '''Install required packages'''
+# Folder holding the app: next to the executable when compiled, next to this script otherwise
+APP_DIR = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
+
+def install_requirements(app_dir):
+    '''Install required packages that are missing or at a different version'''
     requirements = [
         'streamlit==1.45.1',
         'pandas==2.3.0', 
         'numpy==2.3.0',
+        'numba==0.62.0',
         'plotly==6.1.2',
         'scipy==1.15.3',
+        'scikit-learn==1.7.0',
         'asammdf==8.5.0',
-        'openpyxl==3.1.5'
+        'openpyxl==3.1.5',
+        'orjson==3.10.18',
+        'xlsxwriter==3.2.5'
     ]
     
-    print("Installing required packages...")
-    for package in requirements:
+    # Packages already installed at the pinned version need no pip run at all
+    missing = []
+    for requirement in requirements:
+        name, pinned = requirement.split('==')
         try:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package, '--quiet'])
-        except subprocess.CalledProcessError:
-            print(f"Warning: Could not install {package}")
+            if version(name) == pinned:
+                continue
+        except PackageNotFoundError:
+            pass
+        missing.append(requirement)
+    
+    if not missing:
+        return
+    
+    # One pip run for everything missing, offline from the bundled wheels when present
+    wheels_dir = app_dir / 'wheels'
+    wheel_source = ['--no-index', '--find-links', str(wheels_dir)] if wheels_dir.is_dir() else []
+    
+    print("Installing required packages...")
+    try:
+        subprocess.check_call([
+            sys.executable, '-m', 'pip', 'install', '--quiet', '--disable-pip-version-check', '--prefer-binary',
+            *wheel_source, *missing
+        ])
+    except subprocess.CalledProcessError:
+        print(f"Warning: Could not install {', '.join(missing)}")
 
 def open_browser():
-    '''Open browser after delay'''
-    time.sleep(5)
-    webbrowser.open('http://localhost:8501')
+    '''Open browser as soon as the server accepts connections'''
+    # Poll the port instead of sleeping a fixed time; give up waiting after 30 seconds
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', 8501), timeout=0.1):
+                break
+        except OSError:
+            time.sleep(0.05)
+    
+    # On Windows the shell opens the URL in the default browser directly
+    if sys.platform == 'win32':
+        os.startfile('http://localhost:8501')
+    else:
+        import webbrowser
+        webbrowser.open('http://localhost:8501')
 
 def main():
     print("=" * 60)
@@ -43,22 +86,16 @@ def main():
     print("=" * 60)
     
     # Install requirements
-    install_requirements()
+    install_requirements(APP_DIR)
     
     # Start browser thread
     browser_thread = threading.Thread(target=open_browser, daemon=True)
     browser_thread.start()
     
-    # Get app directory
-    if getattr(sys, 'frozen', False):
-        app_dir = Path(sys.executable).parent
-    else:
-        app_dir = Path(__file__).parent
-    
-    app_file = app_dir / 'app.py'
+    app_file = APP_DIR / 'app.py'
     
     if not app_file.exists():
-        print(f"Error: app.py not found in {app_dir}")
+        print(f"Error: app.py not found in {APP_DIR}")
         input("Press Enter to exit...")
         return
     
@@ -66,14 +103,22 @@ def main():
     print("Browser will open automatically at http://localhost:8501")
     print("To stop: Close this window")
     
+    # Run Streamlit's server in this process instead of starting a second interpreter;
+    # it is imported only now, after install_requirements has made sure it is there
+    os.chdir(APP_DIR)
+    importlib.invalidate_caches()
+    from streamlit.web import bootstrap
+    
+    flag_options = {
+        'server_port': 8501,
+        'browser_gatherUsageStats': False,
+        'server_headless': True
+    }
+    
     # Start Streamlit
     try:
-        subprocess.run([
-            sys.executable, '-m', 'streamlit', 'run', str(app_file),
-            '--server.port', '8501',
-            '--browser.gatherUsageStats', 'false',
-            '--server.headless', 'true'
-        ])
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run(str(app_file), False, [], flag_options)
     except KeyboardInterrupt:
         print("Application stopped by user")
     except Exception as e:
@@ -81,4 +126,6 @@ def main():
         input("Press Enter to exit...")
 
 if __name__ == '__main__':
+    # A frozen executable must handle multiprocessing's child-process startup itself
+    multiprocessing.freeze_support()
     main()
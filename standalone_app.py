@@ -4,18 +4,33 @@ Standalone launcher for Mercedes-Benz MF4 Signal Peak Detector
 This script launches the Streamlit application as a standalone executable
 """
 
-import streamlit.web.cli as stcli
 import sys
 import os
-import webbrowser
+import socket
 import time
 import threading
 from pathlib import Path
 
+# Folder holding the app: next to the executable when compiled, next to this script otherwise
+APP_DIR = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
+
 def open_browser():
-    """Open browser after a delay to allow server to start"""
-    time.sleep(3)
-    webbrowser.open('http://localhost:8501')
+    """Open browser as soon as the server accepts connections"""
+    # Poll the port instead of sleeping a fixed time; give up waiting after 30 seconds
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', 8501), timeout=0.1):
+                break
+        except OSError:
+            time.sleep(0.05)
+    
+    # On Windows the shell opens the URL in the default browser directly
+    if sys.platform == 'win32':
+        os.startfile('http://localhost:8501')
+    else:
+        import webbrowser
+        webbrowser.open('http://localhost:8501')
 
 def main():
     """Main entry point for standalone application"""
@@ -29,49 +44,45 @@ def main():
     print("This may take 30-60 seconds on first launch...")
     print("")
     
-    # Get the directory where the executable is located
-    if getattr(sys, 'frozen', False):
-        # Running as compiled executable
-        app_dir = Path(sys.executable).parent
-        print(f"Running from: {app_dir}")
-    else:
-        # Running as script
-        app_dir = Path(__file__).parent
-        print(f"Running from: {app_dir}")
+    print(f"Running from: {APP_DIR}")
     
     # Set the working directory
-    os.chdir(app_dir)
+    os.chdir(APP_DIR)
     
-    # Add the app directory to Python path
-    sys.path.insert(0, str(app_dir))
+    # Add the app directory to Python path, so app_server and utils are importable
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
     
     # Start browser in background thread
     browser_thread = threading.Thread(target=open_browser, daemon=True)
     browser_thread.start()
     
-    # Configure Streamlit arguments
-    sys.argv = [
-        "streamlit",
-        "run",
-        str(app_dir / "app.py"),
-        "--server.port=8501",
-        "--server.address=127.0.0.1",
-        "--browser.serverAddress=127.0.0.1",
-        "--server.headless=true",
-        "--browser.gatherUsageStats=false",
-        "--server.enableXsrfProtection=false"
-    ]
+    # Streamlit config options, keyed like the "streamlit run" flags
+    flag_options = {
+        "server_port": 8501,
+        "server_address": "127.0.0.1",
+        "browser_serverAddress": "127.0.0.1",
+        "server_headless": True,
+        "browser_gatherUsageStats": False,
+        "server_enableXsrfProtection": False
+    }
     
     print("Server starting...")
     print("Application will open in your default browser")
     print("URL: http://localhost:8501")
     print("")
     print("To stop the application, close this window or press Ctrl+C")
-    print("=" * 60)
+    print("=" * 60, flush=True)
     
     try:
-        # Launch Streamlit
-        stcli.main()
+        # Streamlit (and the pandas/numpy/tornado stack behind it) is only imported
+        # now, so the messages above appear as soon as the launcher starts
+        from streamlit.web import bootstrap
+        
+        # Launch Streamlit's server directly rather than through the CLI's
+        # argument parsing; app_server.py serves app.py as an ASGI app
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run_asgi_app(str(APP_DIR / "app_server.py"), "app_server:app", [], flag_options)
     except KeyboardInterrupt:
         print("\nShutting down Mercedes-Benz MF4 Peak Detector...")
         sys.exit(0)
@@ -0,0 +1,71 @@
+import numpy as np
+
+from utils.data_exporter import DataExporter
+
+
+def _peaks(indices, times, heights, widths, prominences):
+    return {
+        'indices': np.array(indices),
+        'times': np.array(times),
+        'heights': np.array(heights),
+        'widths': np.array(widths),
+        'prominences': np.array(prominences)
+    }
+
+
+def _data_lines(csv_text):
+    """CSV lines without the export date, which changes on every run"""
+    return [line for line in csv_text.split('\n') if not line.startswith('# Export Date:')]
+
+
+def test_export_to_csv_matches_pandas_layout():
+    detected_peaks = {
+        'Engine_Speed': _peaks([3, 7], [0.3, 7.0], [12.5, 20.0], [1.0, np.nan], [4.25]),
+        'Coolant_Temp': _peaks([], [], [], [], [])
+    }
+    data = {'duration': 10.0, 'sample_rate': 100.0}
+    
+    csv_text = DataExporter().export_to_csv(detected_peaks, data, ['Engine_Speed', 'Coolant_Temp'])
+    
+    # Unquoted header and strings, whole floats keep their decimal, missing values are empty;
+    # the "no peaks" row turns Peak_Index into a float column, as with DataFrame.to_csv
+    assert _data_lines(csv_text) == [
+        '# MF4 Peak Detection Results',
+        '# Total Signals Analyzed: 2',
+        '# Total Peaks Detected: 2',
+        '# Signal Duration: 10.000 seconds',
+        '# Sample Rate: 100.0 Hz',
+        '',
+        'Signal_Name,Peak_Index,Time_s,Height,Width,Prominence,Note',
+        'Engine_Speed,3.0,0.3,12.5,1.0,4.25,Peak detected',
+        'Engine_Speed,7.0,7.0,20.0,,,Peak detected',
+        'Coolant_Temp,,,,,,No peaks detected',
+        ''
+    ]
+
+
+def test_export_to_csv_writes_integer_peak_indices_when_every_signal_has_peaks():
+    detected_peaks = {
+        'Engine_Speed': _peaks([3, 7], [0.3, 7.0], [12.5, 20.0], [1.0, 2.0], [4.25, 5.0])
+    }
+    data = {'duration': 10.0, 'sample_rate': 100.0}
+    
+    csv_text = DataExporter().export_to_csv(detected_peaks, data, ['Engine_Speed'])
+    
+    assert _data_lines(csv_text)[6:] == [
+        'Signal_Name,Peak_Index,Time_s,Height,Width,Prominence,Note',
+        'Engine_Speed,3,0.3,12.5,1.0,4.25,Peak detected',
+        'Engine_Speed,7,7.0,20.0,2.0,5.0,Peak detected',
+        ''
+    ]
+
+
+def test_export_to_csv_quotes_only_fields_that_need_it():
+    detected_peaks = {
+        'Speed, front axle': _peaks([1], [0.5], [3.0], [1.5], [2.0])
+    }
+    data = {'duration': 1.0, 'sample_rate': 10.0}
+    
+    csv_text = DataExporter().export_to_csv(detected_peaks, data, ['Speed, front axle'])
+    
+    assert _data_lines(csv_text)[7] == '"Speed, front axle",1,0.5,3.0,1.5,2.0,Peak detected'
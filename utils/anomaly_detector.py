@@ -1,8 +1,41 @@
+import logging
+import threading
 import numpy as np
-import pandas as pd
-from scipy import stats
-from typing import Dict, List, Any, Tuple
-import streamlit as st
+from typing import Dict, List, Any, Tuple, Callable, Optional
+from joblib import Parallel, delayed
+from numba import njit
+
+
+@njit(cache=True)
+def _median_absolute_deviation(values, median):
+    """Median absolute deviation of values around the given median"""
+    return np.median(np.abs(values - median))
+
+
+@njit(cache=True)
+def _robust_outliers(values, median, mad, scale, threshold):
+    """Indices and absolute robust z-scores of the values whose score exceeds threshold"""
+    z_scores = np.abs(scale * (values - median) / mad)
+    outlier_idx = np.flatnonzero(z_scores > threshold)
+    return outlier_idx, z_scores[outlier_idx]
+
+
+def _warn(message: str) -> None:
+    """Show a warning in the Streamlit app, or log it when Streamlit isn't available"""
+    # Streamlit is imported lazily so the detector can be used without loading it
+    try:
+        import streamlit as st
+    except ImportError:
+        logging.getLogger(__name__).warning(message)
+    else:
+        st.warning(message)
+
+
+# Peak counts above which medians and quartiles are estimated from a random subsample
+QUANTILE_SAMPLE_SIZE = 10000
+
+# Compile the kernels at import so the first analysis run doesn't pay the JIT latency
+_robust_outliers(np.zeros(2), _median_absolute_deviation(np.zeros(2), 0.0), 1.0, 1.0, 0.0)
 
 class AnomalyDetector:
     """Detects anomalies in peak detection results using statistical methods"""
@@ -31,58 +64,105 @@ class AnomalyDetector:
         Returns:
             Dictionary with anomaly detection results for each signal
         """
-        anomaly_results = {}
+        # Signals without peaks share one empty (read-only) result
+        empty_result = {
+            'anomalies': [],
+            'anomaly_indices': np.empty(0, dtype=int),
+            'anomaly_scores': np.empty(0, dtype=float),
+            'anomaly_types': [],
+            'statistics': {}
+        }
+        signals_with_peaks = [
+            signal_name for signal_name in selected_signals
+            if len(detected_peaks[signal_name]['indices']) > 0
+        ]
+        
+        # Resolve the selected detection methods once for all signals
+        methods = [
+            (method_name, self.anomaly_methods[method_name])
+            for method_name in anomaly_config.get('methods', ['statistical', 'zscore'])
+            if method_name in self.anomaly_methods
+        ]
+        
+        # Height aggregates are computed once per signal and shared across its methods
+        height_stats = {
+            signal_name: self._calculate_height_statistics(detected_peaks[signal_name]['heights'])
+            for signal_name in signals_with_peaks
+        }
         
-        for signal_name in selected_signals:
-            peaks_info = detected_peaks[signal_name]
-            signal_data = data['signals'][signal_name]
-            time_data = data['time']
-            
-            if len(peaks_info['indices']) == 0:
-                anomaly_results[signal_name] = {
-                    'anomalies': [],
-                    'anomaly_indices': np.array([]),
-                    'anomaly_scores': np.array([]),
-                    'anomaly_types': [],
-                    'statistics': {}
-                }
-                continue
-            
-            # Detect anomalies using selected methods
-            signal_anomalies = self._analyze_signal_anomalies(
-                peaks_info, signal_data, time_data, anomaly_config
+        # Every (signal, method) pair is independent, so run them all on worker threads;
+        # the NumPy/sklearn work releases the GIL, so a run takes about as long as its
+        # slowest method instead of the sum of all of them
+        try:
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            script_ctx = get_script_run_ctx(suppress_warning=True)
+        except ImportError:
+            script_ctx = None
+        
+        tasks = [
+            (signal_name, method_name, detect)
+            for signal_name in signals_with_peaks
+            for method_name, detect in methods
+        ]
+        results = Parallel(n_jobs=-1, prefer='threads')(
+            delayed(self._run_method_in_session)(
+                script_ctx, method_name, detect, detected_peaks[signal_name],
+                data['signals'][signal_name], data['time'], anomaly_config,
+                height_stats[signal_name]
             )
-            
-            anomaly_results[signal_name] = signal_anomalies
+            for signal_name, method_name, detect in tasks
+        )
+        
+        # Merge each signal's method results in the configured method order
+        method_results = {signal_name: [] for signal_name in signals_with_peaks}
+        for (signal_name, method_name, _), result in zip(tasks, results):
+            if result is not None:
+                method_results[signal_name].append((method_name, result))
         
-        return anomaly_results
+        return {
+            signal_name: (
+                self._merge_method_results(detected_peaks[signal_name], method_results[signal_name])
+                if signal_name in method_results else empty_result
+            )
+            for signal_name in selected_signals
+        }
     
-    def _analyze_signal_anomalies(self, peaks_info: Dict[str, np.ndarray], 
-                                signal_data: np.ndarray, time_data: np.ndarray,
-                                config: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze anomalies for a single signal"""
+    def _run_method_in_session(self, script_ctx, method_name: str, detect: Callable,
+                               peaks_info: Dict[str, np.ndarray],
+                               signal_data: np.ndarray, time_data: np.ndarray,
+                               config: Dict[str, Any],
+                               height_stats: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """Run one detection method on a worker thread attached to the caller's Streamlit session"""
+        
+        # Without the script context, st.warning calls from worker threads are dropped
+        if script_ctx is not None:
+            from streamlit.runtime.scriptrunner import add_script_run_ctx
+            add_script_run_ctx(threading.current_thread(), script_ctx)
+        
+        try:
+            return detect(peaks_info, signal_data, time_data, config, height_stats)
+        except Exception as e:
+            _warn(f"Anomaly detection method '{method_name}' failed: {str(e)}")
+            return None
+    
+    def _merge_method_results(self, peaks_info: Dict[str, np.ndarray],
+                              method_results: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Combine the detection methods' results for a single signal"""
         
         all_anomalies = []
-        all_anomaly_indices = []
-        all_anomaly_scores = []
+        index_arrays = []
+        score_arrays = []
         all_anomaly_types = []
         
-        # Apply selected anomaly detection methods
-        for method_name in config.get('methods', ['statistical', 'zscore']):
-            if method_name in self.anomaly_methods:
-                try:
-                    method_results = self.anomaly_methods[method_name](
-                        peaks_info, signal_data, time_data, config
-                    )
-                    
-                    if method_results['anomalies']:
-                        all_anomalies.extend(method_results['anomalies'])
-                        all_anomaly_indices.extend(method_results['indices'])
-                        all_anomaly_scores.extend(method_results['scores'])
-                        all_anomaly_types.extend([method_name] * len(method_results['anomalies']))
-                
-                except Exception as e:
-                    st.warning(f"Anomaly detection method '{method_name}' failed: {str(e)}")
+        for method_name, results in method_results:
+            if results['anomalies']:
+                all_anomalies.extend(results['anomalies'])
+                index_arrays.append(results['indices'])
+                score_arrays.append(results['scores'])
+                all_anomaly_types.extend([method_name] * len(results['anomalies']))
+        
+        all_anomaly_indices = np.concatenate(index_arrays) if index_arrays else np.empty(0, dtype=int)
+        all_anomaly_scores = np.concatenate(score_arrays) if score_arrays else np.empty(0)
         
         # Remove duplicates and sort by anomaly score
         unique_anomalies = self._remove_duplicate_anomalies(
@@ -94,100 +174,106 @@ class AnomalyDetector:
         
         return {
             'anomalies': unique_anomalies['anomalies'],
-            'anomaly_indices': np.array(unique_anomalies['indices']),
-            'anomaly_scores': np.array(unique_anomalies['scores']),
+            'anomaly_indices': unique_anomalies['indices'],
+            'anomaly_scores': unique_anomalies['scores'],
             'anomaly_types': unique_anomalies['types'],
             'statistics': statistics
         }
     
     def _detect_statistical_anomalies(self, peaks_info: Dict[str, np.ndarray], 
                                     signal_data: np.ndarray, time_data: np.ndarray,
-                                    config: Dict[str, Any]) -> Dict[str, Any]:
+                                    config: Dict[str, Any],
+                                    height_stats: Dict[str, float]) -> Dict[str, Any]:
         """Detect anomalies using statistical methods (modified z-score)"""
         
         anomalies = []
-        indices = []
-        scores = []
+        indices = np.empty(0, dtype=int)
+        scores = np.empty(0)
         
         if len(peaks_info['heights']) == 0:
-            return {'anomalies': [], 'indices': [], 'scores': []}
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0)}
         
         # Modified Z-score for peak heights
         heights = peaks_info['heights']
-        median_height = np.median(heights)
-        mad_height = np.median(np.abs(heights - median_height))
+        median_height = height_stats['median']
+        mad_height = height_stats['mad']
         
         if mad_height > 0:
-            modified_z_scores = 0.6745 * (heights - median_height) / mad_height
             threshold = config.get('statistical_threshold', 3.5)
+            anomalous_idx, anom_scores = _robust_outliers(
+                heights, median_height, mad_height, 0.6745, threshold
+            )
+            peak_idxs = peaks_info['indices'][anomalous_idx]
+            anom_heights = heights[anomalous_idx]
+            anom_times = self._lookup_peak_times(time_data, peak_idxs)
             
-            anomalous_mask = np.abs(modified_z_scores) > threshold
-            
-            for i, is_anomaly in enumerate(anomalous_mask):
-                if is_anomaly:
-                    peak_idx = peaks_info['indices'][i]
-                    anomalies.append({
-                        'peak_index': int(peak_idx),
-                        'time': float(time_data[peak_idx]) if peak_idx < len(time_data) else 0,
-                        'height': float(heights[i]),
-                        'anomaly_type': 'statistical_height',
-                        'description': f"Peak height {heights[i]:.3f} is statistically anomalous"
-                    })
-                    indices.append(peak_idx)
-                    scores.append(float(np.abs(modified_z_scores[i])))
+            anomalies = [{
+                'peak_index': int(peak_idx),
+                'time': float(peak_time),
+                'height': float(height),
+                'anomaly_type': 'statistical_height',
+                'description': f"Peak height {height:.3f} is statistically anomalous"
+            } for peak_idx, peak_time, height in zip(peak_idxs, anom_times, anom_heights)]
+            indices = peak_idxs
+            scores = anom_scores
         
         return {'anomalies': anomalies, 'indices': indices, 'scores': scores}
     
     def _detect_zscore_anomalies(self, peaks_info: Dict[str, np.ndarray], 
                                signal_data: np.ndarray, time_data: np.ndarray,
-                               config: Dict[str, Any]) -> Dict[str, Any]:
+                               config: Dict[str, Any],
+                               height_stats: Dict[str, float]) -> Dict[str, Any]:
         """Detect anomalies using standard Z-score method"""
         
         anomalies = []
-        indices = []
-        scores = []
+        indices = np.empty(0, dtype=int)
+        scores = np.empty(0)
         
         if len(peaks_info['heights']) == 0:
-            return {'anomalies': [], 'indices': [], 'scores': []}
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0)}
         
         # Z-score for peak heights
         heights = peaks_info['heights']
-        z_scores = np.abs(stats.zscore(heights))
+        mean_height = height_stats['mean']
+        std_height = height_stats['std']
+        z_scores = np.abs((heights - mean_height) / std_height) if std_height > 0 else np.zeros_like(heights)
         threshold = config.get('zscore_threshold', 2.5)
         
-        anomalous_mask = z_scores > threshold
-        
-        for i, is_anomaly in enumerate(anomalous_mask):
-            if is_anomaly:
-                peak_idx = peaks_info['indices'][i]
-                anomalies.append({
-                    'peak_index': int(peak_idx),
-                    'time': float(time_data[peak_idx]) if peak_idx < len(time_data) else 0,
-                    'height': float(heights[i]),
-                    'anomaly_type': 'zscore_height',
-                    'description': f"Peak height {heights[i]:.3f} has Z-score {z_scores[i]:.2f}"
-                })
-                indices.append(peak_idx)
-                scores.append(float(z_scores[i]))
+        anomalous_idx = np.flatnonzero(z_scores > threshold)
+        peak_idxs = peaks_info['indices'][anomalous_idx]
+        anom_heights = heights[anomalous_idx]
+        anom_scores = z_scores[anomalous_idx]
+        anom_times = self._lookup_peak_times(time_data, peak_idxs)
+        
+        anomalies = [{
+            'peak_index': int(peak_idx),
+            'time': float(peak_time),
+            'height': float(height),
+            'anomaly_type': 'zscore_height',
+            'description': f"Peak height {height:.3f} has Z-score {score:.2f}"
+        } for peak_idx, peak_time, height, score in zip(peak_idxs, anom_times, anom_heights, anom_scores)]
+        indices = peak_idxs
+        scores = anom_scores
         
         return {'anomalies': anomalies, 'indices': indices, 'scores': scores}
     
     def _detect_iqr_anomalies(self, peaks_info: Dict[str, np.ndarray], 
                             signal_data: np.ndarray, time_data: np.ndarray,
-                            config: Dict[str, Any]) -> Dict[str, Any]:
+                            config: Dict[str, Any],
+                            height_stats: Dict[str, float]) -> Dict[str, Any]:
         """Detect anomalies using Interquartile Range (IQR) method"""
         
         anomalies = []
-        indices = []
-        scores = []
+        indices = np.empty(0, dtype=int)
+        scores = np.empty(0)
         
         if len(peaks_info['heights']) == 0:
-            return {'anomalies': [], 'indices': [], 'scores': []}
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0)}
         
         # IQR for peak heights
         heights = peaks_info['heights']
-        Q1 = np.percentile(heights, 25)
-        Q3 = np.percentile(heights, 75)
+        Q1 = height_stats['q1']
+        Q3 = height_stats['q3']
         IQR = Q3 - Q1
         
         if IQR > 0:
@@ -195,165 +281,191 @@ class AnomalyDetector:
             lower_bound = Q1 - multiplier * IQR
             upper_bound = Q3 + multiplier * IQR
             
-            anomalous_mask = (heights < lower_bound) | (heights > upper_bound)
+            anomalous_idx = np.flatnonzero((heights < lower_bound) | (heights > upper_bound))
+            peak_idxs = peaks_info['indices'][anomalous_idx]
+            anom_heights = heights[anomalous_idx]
+            anom_scores = np.maximum(np.abs(anom_heights - lower_bound), np.abs(anom_heights - upper_bound)) / IQR
+            anom_times = self._lookup_peak_times(time_data, peak_idxs)
             
-            for i, is_anomaly in enumerate(anomalous_mask):
-                if is_anomaly:
-                    peak_idx = peaks_info['indices'][i]
-                    score = max(abs(heights[i] - lower_bound), abs(heights[i] - upper_bound)) / IQR
-                    
-                    anomalies.append({
-                        'peak_index': int(peak_idx),
-                        'time': float(time_data[peak_idx]) if peak_idx < len(time_data) else 0,
-                        'height': float(heights[i]),
-                        'anomaly_type': 'iqr_height',
-                        'description': f"Peak height {heights[i]:.3f} outside IQR bounds [{lower_bound:.3f}, {upper_bound:.3f}]"
-                    })
-                    indices.append(peak_idx)
-                    scores.append(float(score))
+            anomalies = [{
+                'peak_index': int(peak_idx),
+                'time': float(peak_time),
+                'height': float(height),
+                'anomaly_type': 'iqr_height',
+                'description': f"Peak height {height:.3f} outside IQR bounds [{lower_bound:.3f}, {upper_bound:.3f}]"
+            } for peak_idx, peak_time, height in zip(peak_idxs, anom_times, anom_heights)]
+            indices = peak_idxs
+            scores = anom_scores
         
         return {'anomalies': anomalies, 'indices': indices, 'scores': scores}
     
     def _detect_temporal_anomalies(self, peaks_info: Dict[str, np.ndarray], 
                                  signal_data: np.ndarray, time_data: np.ndarray,
-                                 config: Dict[str, Any]) -> Dict[str, Any]:
+                                 config: Dict[str, Any],
+                                 height_stats: Dict[str, float]) -> Dict[str, Any]:
         """Detect temporal anomalies in peak occurrence patterns"""
         
         anomalies = []
-        indices = []
-        scores = []
+        indices = np.empty(0, dtype=int)
+        scores = np.empty(0)
         
         if len(peaks_info['indices']) < 3:
-            return {'anomalies': [], 'indices': [], 'scores': []}
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0)}
         
         # Calculate time intervals between peaks
         peak_times = time_data[peaks_info['indices']]
         intervals = np.diff(peak_times)
         
         if len(intervals) < 2:
-            return {'anomalies': [], 'indices': [], 'scores': []}
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0)}
         
         # Detect anomalous intervals
-        median_interval = np.median(intervals)
-        mad_interval = np.median(np.abs(intervals - median_interval))
+        interval_sample = self._estimation_sample(intervals)
+        median_interval = np.median(interval_sample)
+        mad_interval = _median_absolute_deviation(interval_sample, median_interval)
         
         if mad_interval > 0:
             threshold = config.get('temporal_threshold', 3.0)
+            anomalous_idx, anom_scores = _robust_outliers(
+                intervals, median_interval, mad_interval, 1.0, threshold
+            )
             
-            for i, interval in enumerate(intervals):
-                z_score = abs(interval - median_interval) / mad_interval
-                
-                if z_score > threshold:
-                    peak_idx = peaks_info['indices'][i + 1]
-                    anomalies.append({
-                        'peak_index': int(peak_idx),
-                        'time': float(peak_times[i + 1]),
-                        'height': float(peaks_info['heights'][i + 1]),
-                        'anomaly_type': 'temporal_interval',
-                        'description': f"Unusual time interval {interval:.3f}s between peaks"
-                    })
-                    indices.append(peak_idx)
-                    scores.append(float(z_score))
+            peak_idxs = peaks_info['indices'][anomalous_idx + 1]
+            
+            anomalies = [{
+                'peak_index': int(peak_idx),
+                'time': float(peak_time),
+                'height': float(height),
+                'anomaly_type': 'temporal_interval',
+                'description': f"Unusual time interval {interval:.3f}s between peaks"
+            } for peak_idx, peak_time, height, interval in zip(
+                peak_idxs, peak_times[anomalous_idx + 1],
+                peaks_info['heights'][anomalous_idx + 1], intervals[anomalous_idx]
+            )]
+            indices = peak_idxs
+            scores = anom_scores
         
         return {'anomalies': anomalies, 'indices': indices, 'scores': scores}
     
     def _detect_isolation_forest_anomalies(self, peaks_info: Dict[str, np.ndarray], 
                                          signal_data: np.ndarray, time_data: np.ndarray,
-                                         config: Dict[str, Any]) -> Dict[str, Any]:
-        """Detect anomalies using Isolation Forest (simplified implementation)"""
+                                         config: Dict[str, Any],
+                                         height_stats: Dict[str, float]) -> Dict[str, Any]:
+        """Detect anomalies using an Isolation Forest over peak height, width and prominence"""
         
         anomalies = []
-        indices = []
-        scores = []
+        indices = np.empty(0, dtype=int)
+        scores = np.empty(0)
         
         if len(peaks_info['heights']) < 10:  # Need minimum samples
-            return {'anomalies': [], 'indices': [], 'scores': []}
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0)}
         
         try:
-            # Create feature matrix
-            features = []
-            for i in range(len(peaks_info['indices'])):
-                feature_vector = [
-                    peaks_info['heights'][i],
-                    peaks_info['widths'][i] if i < len(peaks_info['widths']) and not np.isnan(peaks_info['widths'][i]) else 0,
-                    peaks_info['prominences'][i] if i < len(peaks_info['prominences']) and not np.isnan(peaks_info['prominences'][i]) else 0
-                ]
-                features.append(feature_vector)
-            
-            features = np.array(features)
+            # Create feature matrix (missing or NaN widths/prominences count as 0)
+            n_peaks = len(peaks_info['indices'])
+            widths = np.zeros(n_peaks)
+            prominences = np.zeros(n_peaks)
+            widths[:len(peaks_info['widths'])] = np.nan_to_num(peaks_info['widths'][:n_peaks], nan=0.0)
+            prominences[:len(peaks_info['prominences'])] = np.nan_to_num(peaks_info['prominences'][:n_peaks], nan=0.0)
             
-            # Simple outlier detection based on feature distances
-            mean_features = np.mean(features, axis=0)
-            std_features = np.std(features, axis=0)
+            features = np.column_stack([peaks_info['heights'][:n_peaks], widths, prominences])
             
-            # Normalize features
-            normalized_features = (features - mean_features) / (std_features + 1e-8)
+            # scikit-learn is only loaded once this method is actually selected
+            from sklearn.ensemble import IsolationForest
             
-            # Calculate distances from mean
-            distances = np.linalg.norm(normalized_features, axis=1)
-            threshold = np.percentile(distances, config.get('isolation_percentile', 95))
+            # Fit the forest and score all peaks in one bulk call (higher = more anomalous)
+            forest = IsolationForest(
+                n_estimators=config.get('n_estimators', 100),
+                max_samples=min(256, n_peaks),
+                n_jobs=-1,
+                random_state=0
+            ).fit(features)
+            isolation_scores = -forest.score_samples(features)
+            threshold = np.percentile(isolation_scores, config.get('isolation_percentile', 95))
             
-            anomalous_mask = distances > threshold
+            anomalous_idx = np.flatnonzero(isolation_scores > threshold)
+            peak_idxs = peaks_info['indices'][anomalous_idx]
+            anom_heights = peaks_info['heights'][anomalous_idx]
+            anom_times = self._lookup_peak_times(time_data, peak_idxs)
             
-            for i, is_anomaly in enumerate(anomalous_mask):
-                if is_anomaly:
-                    peak_idx = peaks_info['indices'][i]
-                    anomalies.append({
-                        'peak_index': int(peak_idx),
-                        'time': float(time_data[peak_idx]) if peak_idx < len(time_data) else 0,
-                        'height': float(peaks_info['heights'][i]),
-                        'anomaly_type': 'isolation_forest',
-                        'description': f"Peak with unusual feature combination"
-                    })
-                    indices.append(peak_idx)
-                    scores.append(float(distances[i]))
+            anomalies = [{
+                'peak_index': int(peak_idx),
+                'time': float(peak_time),
+                'height': float(height),
+                'anomaly_type': 'isolation_forest',
+                'description': f"Peak with unusual feature combination"
+            } for peak_idx, peak_time, height in zip(peak_idxs, anom_times, anom_heights)]
+            indices = peak_idxs
+            scores = isolation_scores[anomalous_idx]
         
         except Exception as e:
-            st.warning(f"Isolation forest anomaly detection failed: {str(e)}")
+            _warn(f"Isolation forest anomaly detection failed: {str(e)}")
         
         return {'anomalies': anomalies, 'indices': indices, 'scores': scores}
     
-    def _remove_duplicate_anomalies(self, anomalies: List[Dict], indices: List[int], 
-                                  scores: List[float], types: List[str]) -> Dict[str, Any]:
+    def _calculate_height_statistics(self, heights: np.ndarray) -> Dict[str, float]:
+        """Calculate the peak height aggregates shared by the height-based detectors"""
+        
+        if len(heights) == 0:
+            return {}
+        
+        # Quantile-based estimates come from a subsample for very large peak counts
+        height_sample = self._estimation_sample(heights)
+        q1, median, q3 = np.percentile(height_sample, [25, 50, 75])
+        
+        return {
+            'median': median,
+            'mad': _median_absolute_deviation(height_sample, median),
+            'mean': heights.mean(),
+            'std': heights.std(),
+            'q1': q1,
+            'q3': q3
+        }
+    
+    def _estimation_sample(self, values: np.ndarray) -> np.ndarray:
+        """
+        Subsample values used only to estimate medians and quartiles
+        
+        Above QUANTILE_SAMPLE_SIZE values the estimates are statistically indistinguishable
+        from the full-array ones, while sorting the sample is far cheaper. Thresholds are
+        still applied to every value.
+        """
+        if len(values) <= QUANTILE_SAMPLE_SIZE:
+            return values
+        
+        # Fixed seed keeps results reproducible between reruns
+        rng = np.random.default_rng(0)
+        return rng.choice(values, size=QUANTILE_SAMPLE_SIZE, replace=False)
+    
+    def _lookup_peak_times(self, time_data: np.ndarray, peak_idxs: np.ndarray) -> np.ndarray:
+        """Look up peak times, using 0 for indices beyond the end of the time axis"""
+        peak_times = np.zeros(len(peak_idxs))
+        in_range = peak_idxs < len(time_data)
+        peak_times[in_range] = time_data[peak_idxs[in_range]]
+        return peak_times
+    
+    def _remove_duplicate_anomalies(self, anomalies: List[Dict], indices: np.ndarray, 
+                                  scores: np.ndarray, types: List[str]) -> Dict[str, Any]:
         """Remove duplicate anomalies and keep the highest scoring ones"""
         
         if not anomalies:
-            return {'anomalies': [], 'indices': [], 'scores': [], 'types': []}
-        
-        # Group by peak index
-        grouped = {}
-        for i, anomaly in enumerate(anomalies):
-            peak_idx = anomaly['peak_index']
-            if peak_idx not in grouped:
-                grouped[peak_idx] = []
-            grouped[peak_idx].append({
-                'anomaly': anomaly,
-                'index': indices[i],
-                'score': scores[i],
-                'type': types[i]
-            })
-        
-        # Keep highest scoring anomaly for each peak
-        unique_anomalies = []
-        unique_indices = []
-        unique_scores = []
-        unique_types = []
-        
-        for peak_idx, group in grouped.items():
-            best = max(group, key=lambda x: x['score'])
-            unique_anomalies.append(best['anomaly'])
-            unique_indices.append(best['index'])
-            unique_scores.append(best['score'])
-            unique_types.append(best['type'])
+            return {'anomalies': [], 'indices': np.empty(0, dtype=int), 'scores': np.empty(0), 'types': []}
+        
+        # Order by peak index, highest score first within each peak (stable, so ties keep detection order)
+        order = np.lexsort((-scores, indices))
+        
+        # The first entry of each peak group is its highest scoring anomaly
+        _, first_in_group = np.unique(indices[order], return_index=True)
+        best = order[first_in_group]
         
         # Sort by score (highest first)
-        sorted_indices = np.argsort(unique_scores)[::-1]
+        best = best[np.argsort(-scores[best], kind='stable')]
         
         return {
-            'anomalies': [unique_anomalies[i] for i in sorted_indices],
-            'indices': [unique_indices[i] for i in sorted_indices],
-            'scores': [unique_scores[i] for i in sorted_indices],
-            'types': [unique_types[i] for i in sorted_indices]
+            'anomalies': [anomalies[i] for i in best],
+            'indices': indices[best],
+            'scores': scores[best],
+            'types': [types[i] for i in best]
         }
     
     def _calculate_anomaly_statistics(self, peaks_info: Dict[str, np.ndarray], 
@@ -365,15 +477,19 @@ class AnomalyDetector:
         anomaly_rate = total_anomalies / total_peaks if total_peaks > 0 else 0
         
         # Count anomalies by type
-        type_counts = {}
-        for anomaly_type in unique_anomalies['types']:
-            type_counts[anomaly_type] = type_counts.get(anomaly_type, 0) + 1
+        if unique_anomalies['types']:
+            anomaly_types, counts = np.unique(unique_anomalies['types'], return_counts=True)
+            type_counts = dict(zip(anomaly_types.tolist(), counts.tolist()))
+        else:
+            type_counts = {}
+        
+        scores = unique_anomalies['scores']
         
         return {
             'total_peaks': total_peaks,
             'total_anomalies': total_anomalies,
             'anomaly_rate': anomaly_rate,
             'anomaly_types_count': type_counts,
-            'mean_anomaly_score': float(np.mean(unique_anomalies['scores'])) if unique_anomalies['scores'] else 0,
-            'max_anomaly_score': float(np.max(unique_anomalies['scores'])) if unique_anomalies['scores'] else 0
+            'mean_anomaly_score': float(scores.mean()) if scores.size else 0,
+            'max_anomaly_score': float(scores.max()) if scores.size else 0
         }
\ No newline at end of file
@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-import json
+import orjson
 import io
+import warnings
 from typing import Dict, List, Any
 
 class DataExporter:
@@ -24,38 +25,48 @@ class DataExporter:
             CSV data as string
         """
         try:
-            export_rows = []
+            # Accumulate each column as per-signal arrays and build the DataFrame in one go
+            names_list = []
+            indices_list = []
+            times_list = []
+            heights_list = []
+            widths_list = []
+            prominences_list = []
+            notes_list = []
             
             for signal_name in selected_signals:
                 peaks_info = detected_peaks[signal_name]
+                n_peaks = len(peaks_info['indices'])
                 
-                if len(peaks_info['indices']) == 0:
+                if n_peaks == 0:
                     # Add a row indicating no peaks found
-                    export_rows.append({
-                        'Signal_Name': signal_name,
-                        'Peak_Index': None,
-                        'Time_s': None,
-                        'Height': None,
-                        'Width': None,
-                        'Prominence': None,
-                        'Note': 'No peaks detected'
-                    })
+                    names_list.append(np.array([signal_name], dtype=object))
+                    indices_list.append(np.array([np.nan]))
+                    times_list.append(np.array([np.nan]))
+                    heights_list.append(np.array([np.nan]))
+                    widths_list.append(np.array([np.nan]))
+                    prominences_list.append(np.array([np.nan]))
+                    notes_list.append(np.array(['No peaks detected'], dtype=object))
                 else:
                     # Add rows for each detected peak
-                    for i in range(len(peaks_info['indices'])):
-                        row = {
-                            'Signal_Name': signal_name,
-                            'Peak_Index': int(peaks_info['indices'][i]),
-                            'Time_s': float(peaks_info['times'][i]) if len(peaks_info['times']) > i else None,
-                            'Height': float(peaks_info['heights'][i]) if len(peaks_info['heights']) > i else None,
-                            'Width': float(peaks_info['widths'][i]) if len(peaks_info['widths']) > i and not np.isnan(peaks_info['widths'][i]) else None,
-                            'Prominence': float(peaks_info['prominences'][i]) if len(peaks_info['prominences']) > i and not np.isnan(peaks_info['prominences'][i]) else None,
-                            'Note': 'Peak detected'
-                        }
-                        export_rows.append(row)
+                    names_list.append(np.full(n_peaks, signal_name, dtype=object))
+                    indices_list.append(np.asarray(peaks_info['indices'], dtype=int))
+                    times_list.append(self._peak_column(peaks_info, 'times', n_peaks))
+                    heights_list.append(self._peak_column(peaks_info, 'heights', n_peaks))
+                    widths_list.append(self._peak_column(peaks_info, 'widths', n_peaks))
+                    prominences_list.append(self._peak_column(peaks_info, 'prominences', n_peaks))
+                    notes_list.append(np.full(n_peaks, 'Peak detected', dtype=object))
             
             # Create DataFrame and convert to CSV
-            df = pd.DataFrame(export_rows)
+            df = pd.DataFrame({
+                'Signal_Name': np.concatenate(names_list),
+                'Peak_Index': np.concatenate(indices_list),
+                'Time_s': np.concatenate(times_list),
+                'Height': np.concatenate(heights_list),
+                'Width': np.concatenate(widths_list),
+                'Prominence': np.concatenate(prominences_list),
+                'Note': np.concatenate(notes_list)
+            })
             
             # Add metadata header
             metadata_rows = [
@@ -121,27 +132,36 @@ class DataExporter:
                     'peaks': []
                 }
                 
-                if len(peaks_info['indices']) > 0:
-                    for i in range(len(peaks_info['indices'])):
-                        peak = {
-                            'index': int(peaks_info['indices'][i]),
-                            'time_seconds': float(peaks_info['times'][i]) if len(peaks_info['times']) > i else None,
-                            'height': float(peaks_info['heights'][i]) if len(peaks_info['heights']) > i else None,
-                            'width': float(peaks_info['widths'][i]) if len(peaks_info['widths']) > i and not np.isnan(peaks_info['widths'][i]) else None,
-                            'prominence': float(peaks_info['prominences'][i]) if len(peaks_info['prominences']) > i and not np.isnan(peaks_info['prominences'][i]) else None
-                        }
-                        signal_data['peaks'].append(peak)
+                n_peaks = len(peaks_info['indices'])
+                if n_peaks > 0:
+                    signal_data['peaks'] = [{
+                        'index': index,
+                        'time_seconds': time_seconds,
+                        'height': height,
+                        'width': width,
+                        'prominence': prominence
+                    } for index, time_seconds, height, width, prominence in zip(
+                        np.asarray(peaks_info['indices'], dtype=int).tolist(),
+                        self._peak_list(peaks_info, 'times', n_peaks),
+                        self._peak_list(peaks_info, 'heights', n_peaks),
+                        self._peak_list(peaks_info, 'widths', n_peaks, nan_as_none=True),
+                        self._peak_list(peaks_info, 'prominences', n_peaks, nan_as_none=True)
+                    )]
                 
                 # Add signal statistics
                 signal_data['statistics'] = self._calculate_signal_statistics(peaks_info)
                 
                 export_data['signals'][signal_name] = signal_data
             
-            # Convert to JSON string with proper formatting
-            return json.dumps(export_data, indent=2, ensure_ascii=False)
+            # Convert to JSON string with proper formatting (orjson encodes in native code
+            # and handles NumPy values and datetimes directly)
+            return orjson.dumps(
+                export_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ).decode('utf-8')
             
         except Exception as e:
-            return json.dumps({'error': f'Error generating JSON: {str(e)}'}, indent=2)
+            return orjson.dumps({'error': f'Error generating JSON: {str(e)}'}, option=orjson.OPT_INDENT_2).decode('utf-8')
     
     def export_to_excel(self, detected_peaks: Dict[str, Dict[str, np.ndarray]], 
                        data: Dict[str, Any], selected_signals: List[str]) -> bytes:
@@ -160,7 +180,8 @@ class DataExporter:
             # Create Excel writer object
             excel_buffer = io.BytesIO()
             
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+            # xlsxwriter writes noticeably faster than openpyxl for many-sheet workbooks
+            with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
                 # Create summary sheet
                 summary_data = []
                 for signal_name in selected_signals:
@@ -183,18 +204,15 @@ class DataExporter:
                 for signal_name in selected_signals:
                     peaks_info = detected_peaks[signal_name]
                     
-                    if len(peaks_info['indices']) > 0:
-                        detail_data = []
-                        for i in range(len(peaks_info['indices'])):
-                            detail_data.append({
-                                'Peak Index': int(peaks_info['indices'][i]),
-                                'Time (s)': float(peaks_info['times'][i]) if len(peaks_info['times']) > i else None,
-                                'Height': float(peaks_info['heights'][i]) if len(peaks_info['heights']) > i else None,
-                                'Width': float(peaks_info['widths'][i]) if len(peaks_info['widths']) > i and not np.isnan(peaks_info['widths'][i]) else None,
-                                'Prominence': float(peaks_info['prominences'][i]) if len(peaks_info['prominences']) > i and not np.isnan(peaks_info['prominences'][i]) else None
-                            })
-                        
-                        detail_df = pd.DataFrame(detail_data)
+                    n_peaks = len(peaks_info['indices'])
+                    if n_peaks > 0:
+                        detail_df = pd.DataFrame({
+                            'Peak Index': np.asarray(peaks_info['indices'], dtype=int),
+                            'Time (s)': self._peak_column(peaks_info, 'times', n_peaks),
+                            'Height': self._peak_column(peaks_info, 'heights', n_peaks),
+                            'Width': self._peak_column(peaks_info, 'widths', n_peaks),
+                            'Prominence': self._peak_column(peaks_info, 'prominences', n_peaks)
+                        })
                         # Truncate sheet name if too long
                         sheet_name = signal_name[:31] if len(signal_name) > 31 else signal_name
                         detail_df.to_excel(writer, sheet_name=sheet_name, index=False)
@@ -206,6 +224,62 @@ class DataExporter:
             # Return empty bytes if error
             return b''
     
+    def _peak_column(self, peaks_info: Dict[str, np.ndarray], key: str, n_peaks: int) -> np.ndarray:
+        """
+        Get a peak property as a float array with one entry per peak
+        
+        Args:
+            peaks_info: Peak information for a single signal
+            key: Name of the peak property
+            n_peaks: Number of detected peaks
+            
+        Returns:
+            Array of length n_peaks, padded with NaN where values are missing
+        """
+        column = np.full(n_peaks, np.nan)
+        values = peaks_info[key][:n_peaks]
+        column[:len(values)] = values
+        return column
+    
+    def _peak_list(self, peaks_info: Dict[str, np.ndarray], key: str, n_peaks: int,
+                   nan_as_none: bool = False) -> List[Any]:
+        """
+        Get a peak property as a list of Python floats with one entry per peak
+        
+        Args:
+            peaks_info: Peak information for a single signal
+            key: Name of the peak property
+            n_peaks: Number of detected peaks
+            nan_as_none: Whether NaN values should be replaced by None
+            
+        Returns:
+            List of length n_peaks, padded with None where values are missing
+        """
+        values = np.asarray(peaks_info[key][:n_peaks], dtype=float)
+        if nan_as_none:
+            values = np.where(np.isnan(values), None, values)
+        return values.tolist() + [None] * (n_peaks - len(values))
+    
+    def _nanmean_or_zero(self, values: np.ndarray) -> float:
+        """
+        Calculate the mean of the non-NaN values
+        
+        Args:
+            values: Array of values that may contain NaN
+            
+        Returns:
+            Mean of the valid values, or 0.0 if there are none
+        """
+        if len(values) == 0:
+            return 0.0
+        
+        with warnings.catch_warnings():
+            # All-NaN input returns NaN with a "Mean of empty slice" warning
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(values)
+        
+        return 0.0 if np.isnan(mean) else float(mean)
+    
     def _calculate_signal_statistics(self, peaks_info: Dict[str, np.ndarray]) -> Dict[str, float]:
         """
         Calculate statistics for a signal's peaks
@@ -236,25 +310,9 @@ class DataExporter:
             else:
                 stats['mean_height'] = 0.0
             
-            # Width statistics
-            if len(peaks_info['widths']) > 0:
-                valid_widths = peaks_info['widths'][~np.isnan(peaks_info['widths'])]
-                if len(valid_widths) > 0:
-                    stats['mean_width'] = float(np.mean(valid_widths))
-                else:
-                    stats['mean_width'] = 0.0
-            else:
-                stats['mean_width'] = 0.0
-            
-            # Prominence statistics
-            if len(peaks_info['prominences']) > 0:
-                valid_prominences = peaks_info['prominences'][~np.isnan(peaks_info['prominences'])]
-                if len(valid_prominences) > 0:
-                    stats['mean_prominence'] = float(np.mean(valid_prominences))
-                else:
-                    stats['mean_prominence'] = 0.0
-            else:
-                stats['mean_prominence'] = 0.0
+            # Width and prominence statistics (NaN entries are ignored)
+            stats['mean_width'] = self._nanmean_or_zero(peaks_info['widths'])
+            stats['mean_prominence'] = self._nanmean_or_zero(peaks_info['prominences'])
             
             # Peak rate
             if len(peaks_info['times']) > 0:
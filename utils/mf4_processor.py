@@ -1,23 +1,91 @@
 import numpy as np
-import pandas as pd
 from asammdf import MDF
+from numba import njit
 import streamlit as st
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import tempfile
+import hashlib
+import shutil
+import json
+import time
 import os
+from datetime import datetime
+
+# Minimum seconds between progress bar updates; each update is a websocket message
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# Chunk size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Decoded signals are cached here as .npy files, one directory per upload hash
+SIGNAL_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'mf4_signal_cache')
+
+# Version of the decoding and NaN filling behind the cached arrays; bump it when either
+# changes, since entries in the temp directory outlive app upgrades
+SIGNAL_CACHE_VERSION = 1
+
+# Total size the signal cache may grow to; least recently used entries are removed beyond it
+SIGNAL_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+
+@njit(cache=True, nogil=True)
+def _fill_nan_runs(values):
+    """Linearly interpolate NaN runs in place between their valid neighbours, like np.interp over sample indices"""
+    n_samples = len(values)
+    last_valid = -1
+    i = 0
+    while i < n_samples:
+        if not np.isnan(values[i]):
+            last_valid = i
+            i += 1
+            continue
+        
+        run_start = i
+        while i < n_samples and np.isnan(values[i]):
+            i += 1
+        
+        if last_valid < 0:
+            # Leading run takes the first valid value
+            values[run_start:i] = values[i]
+        elif i == n_samples:
+            # Trailing run takes the last valid value
+            values[run_start:i] = values[last_valid]
+        else:
+            step = (values[i] - values[last_valid]) / (i - last_valid)
+            for j in range(run_start, i):
+                values[j] = values[last_valid] + step * (j - last_valid)
+
+
+@njit(cache=True, nogil=True)
+def _count_non_nan(values):
+    """Number of non-NaN samples, counted in one pass without allocating a mask"""
+    count = 0
+    for i in range(len(values)):
+        # Only NaN compares unequal to itself; adding the comparison keeps the loop branch-free
+        count += values[i] == values[i]
+    return count
+
+
+# Compile the kernels at import so the first upload doesn't pay the JIT latency
+_fill_nan_runs(np.array([0.0, np.nan, 1.0]))
+_count_non_nan(np.zeros(2, dtype=np.float32))
+_count_non_nan(np.zeros(2, dtype=np.float64))
 
 class MF4Processor:
     """Handles MF4 file processing using ASAMDF library"""
     
     def __init__(self):
         self.mdf = None
+        self._cached_timestamps = None
         
-    def process_file(self, uploaded_file) -> Optional[Dict[str, Any]]:
+    def process_file(self, uploaded_file, channels: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Process an uploaded MF4 file and extract signal data
         
         Args:
             uploaded_file: Streamlit uploaded file object
+            channels: Optional list of channel names to load; all channels if None
             
         Returns:
             Dictionary containing processed signal data or None if error
@@ -25,21 +93,55 @@ class MF4Processor:
         try:
             # Create temporary file for ASAMDF processing
             with tempfile.NamedTemporaryFile(delete=False, suffix='.mf4') as tmp_file:
-                tmp_file.write(uploaded_file.read())
+                # Stream in chunks rather than holding the whole upload in memory twice,
+                # hashing along the way to key the decoded-signal cache
+                file_hash = hashlib.sha256()
+                if hasattr(uploaded_file, 'getbuffer'):
+                    # In-memory uploads (Streamlit's UploadedFile is a BytesIO) are hashed
+                    # and written straight from their buffer without any intermediate copy
+                    with uploaded_file.getbuffer() as buffer:
+                        file_hash.update(buffer)
+                        tmp_file.write(buffer)
+                else:
+                    for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b''):
+                        file_hash.update(chunk)
+                        tmp_file.write(chunk)
                 tmp_file_path = tmp_file.name
             
+            file_hash.update(f'\0v{SIGNAL_CACHE_VERSION}\0'.encode('utf-8'))
+            if channels:
+                file_hash.update('\0'.join(channels).encode('utf-8'))
+            cache_key = file_hash.hexdigest()
+            
             try:
-                # Load MF4 file with ASAMDF
-                self.mdf = MDF(tmp_file_path)
-                
-                # Extract basic file information
-                file_info = self._extract_file_info()
-                
-                # Extract signal data
-                signals_data = self._extract_signals()
-                
-                # Create time axis
-                time_axis = self._create_time_axis()
+                # Reuse signals decoded from the same file earlier, memory-mapped from disk;
+                # entries that also hold the file info don't need the MF4 file opened at all
+                cached = self._load_cached_signals(cache_key)
+                if cached is not None and cached[2] is not None:
+                    signals_data, time_axis, file_info = cached
+                else:
+                    # Load MF4 file with ASAMDF, restricted to the requested channels if given
+                    self.mdf = MDF(
+                        tmp_file_path,
+                        channels=channels,
+                        use_display_names=False,
+                        remove_source_from_channel_names=False
+                    )
+                    
+                    # Extract basic file information
+                    file_info = self._extract_file_info()
+                    
+                    if cached is not None:
+                        signals_data, time_axis, _ = cached
+                    else:
+                        # Extract signal data
+                        signals_data = self._extract_signals()
+                        
+                        # Create time axis
+                        time_axis = self._create_time_axis()
+                        
+                        if signals_data:
+                            self._save_cached_signals(cache_key, signals_data, time_axis, file_info)
                 
                 # Combine all data
                 processed_data = {
@@ -61,6 +163,130 @@ class MF4Processor:
             st.error(f"Error processing MF4 file: {str(e)}")
             return None
     
+    def _load_cached_signals(self, cache_key: str) -> Optional[Tuple[Dict[str, np.ndarray], np.ndarray, Optional[Dict[str, Any]]]]:
+        """Memory-map previously decoded signals and time axis for a file, and load its file info, if cached"""
+        cache_path = os.path.join(SIGNAL_CACHE_DIR, cache_key)
+        manifest_path = os.path.join(cache_path, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                signal_names = json.load(f)
+            
+            signals = {
+                name: np.load(os.path.join(cache_path, f'signal_{i}.npy'), mmap_mode='r')
+                for i, name in enumerate(signal_names)
+            }
+            time_axis = np.load(os.path.join(cache_path, 'time.npy'), mmap_mode='r')
+            
+            # Mark the entry as recently used so eviction removes other entries first
+            os.utime(cache_path)
+            
+            # Entries written before the file info was cached don't have it
+            file_info = None
+            file_info_path = os.path.join(cache_path, 'file_info.json')
+            if os.path.exists(file_info_path):
+                with open(file_info_path, 'r', encoding='utf-8') as f:
+                    file_info = json.load(f)
+                if file_info.get('start_time') is not None:
+                    file_info['start_time'] = datetime.fromisoformat(file_info['start_time'])
+            
+            return signals, time_axis, file_info
+            
+        except (OSError, ValueError):
+            # Unreadable cache entries are ignored and the file is decoded again
+            return None
+    
+    def _save_cached_signals(self, cache_key: str, signals: Dict[str, np.ndarray], time_axis: np.ndarray,
+                             file_info: Dict[str, Any]):
+        """Write decoded signals and time axis as .npy files so later loads can memory-map them"""
+        cache_path = os.path.join(SIGNAL_CACHE_DIR, cache_key)
+        if os.path.exists(os.path.join(cache_path, 'manifest.json')):
+            return
+        
+        staging_path = None
+        try:
+            os.makedirs(SIGNAL_CACHE_DIR, exist_ok=True)
+            
+            # A directory without a manifest is what's left of an entry that couldn't be removed
+            if os.path.exists(cache_path):
+                shutil.rmtree(cache_path, ignore_errors=True)
+            
+            # Write into a staging directory and rename it, so a partial entry is never read
+            staging_path = tempfile.mkdtemp(dir=SIGNAL_CACHE_DIR)
+            for i, signal_data in enumerate(signals.values()):
+                np.save(os.path.join(staging_path, f'signal_{i}.npy'), signal_data)
+            np.save(os.path.join(staging_path, 'time.npy'), time_axis)
+            
+            # Signal names can contain characters that aren't valid in file names
+            with open(os.path.join(staging_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(list(signals), f)
+            
+            # File info with values JSON can't hold is left out; the file is opened again instead
+            start_time = file_info.get('start_time')
+            try:
+                file_info_json = json.dumps({
+                    **file_info,
+                    'start_time': start_time.isoformat() if isinstance(start_time, datetime) else None
+                })
+            except (TypeError, ValueError):
+                file_info_json = None
+            if file_info_json is not None:
+                with open(os.path.join(staging_path, 'file_info.json'), 'w', encoding='utf-8') as f:
+                    f.write(file_info_json)
+            
+            try:
+                os.replace(staging_path, cache_path)
+            except OSError:
+                # Another session decoding the same file may have cached it first
+                if not os.path.exists(os.path.join(cache_path, 'manifest.json')):
+                    raise
+                shutil.rmtree(staging_path, ignore_errors=True)
+                return
+            
+        except OSError as e:
+            if staging_path is not None:
+                shutil.rmtree(staging_path, ignore_errors=True)
+            st.warning(f"Could not cache decoded signals: {str(e)}")
+            return
+        
+        self._evict_cached_signals(cache_key)
+    
+    def _evict_cached_signals(self, keep_key: str):
+        """Remove least recently used cache entries until the cache fits in SIGNAL_CACHE_MAX_BYTES"""
+        entries = []
+        total_size = 0
+        try:
+            for entry in os.scandir(SIGNAL_CACHE_DIR):
+                # Only complete entries count; staging directories may still be being written
+                if not entry.is_dir() or not os.path.exists(os.path.join(entry.path, 'manifest.json')):
+                    continue
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                total_size += size
+                
+                # The entry just written is never evicted
+                if entry.name != keep_key:
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+        except OSError:
+            return
+        
+        # Oldest use first
+        for _, size, path in sorted(entries):
+            if total_size <= SIGNAL_CACHE_MAX_BYTES:
+                break
+            
+            # Move the entry aside before deleting it: on Windows the rename fails while another
+            # session still has its files memory-mapped, and the entry stays whole and usable
+            evicted_path = f'{path}.evicted'
+            shutil.rmtree(evicted_path, ignore_errors=True)
+            try:
+                os.rename(path, evicted_path)
+            except OSError:
+                continue
+            shutil.rmtree(evicted_path, ignore_errors=True)
+            total_size -= size
+    
     def _extract_file_info(self) -> Dict[str, Any]:
         """Extract basic information from MF4 file"""
         try:
@@ -87,17 +313,19 @@ class MF4Processor:
                 
                 # Calculate duration from actual data
                 try:
-                    # Get a sample channel to determine duration
-                    channels = list(self.mdf.channels_db.keys())
-                    if channels:
-                        sample_signal = self.mdf.get(channels[0])
-                        if hasattr(sample_signal, 'timestamps') and len(sample_signal.timestamps) > 0:
-                            info['duration'] = float(sample_signal.timestamps[-1] - sample_signal.timestamps[0])
-                        else:
-                            info['duration'] = 0.0
-                    else:
-                        info['duration'] = 0.0
-                except:
+                    # Read only the first and last master samples of the first non-empty group
+                    # instead of decoding a whole channel
+                    info['duration'] = 0.0
+                    for group_index, group in enumerate(self.mdf.groups):
+                        cycles = group.channel_group.cycles_nr
+                        if cycles > 0:
+                            first = self.mdf.get_master(group_index, record_offset=0, record_count=1)
+                            last = self.mdf.get_master(group_index, record_offset=cycles - 1, record_count=1)
+                            if len(first) > 0 and len(last) > 0:
+                                info['duration'] = float(last[0] - first[0])
+                            break
+                except Exception:
+                    # Unreadable master data only costs the duration, not the whole file info
                     info['duration'] = 0.0
             else:
                 info['sample_rate'] = 1.0
@@ -122,101 +350,98 @@ class MF4Processor:
         signals = {}
         
         try:
-            # Get all available channels with proper handling of duplicates
-            all_channels = []
+            # Get all available channels with proper handling of duplicates, kept as
+            # parallel lists: the select() spec, the output name and the data group
+            selection = []
+            unique_names = []
+            groups = []
+            seen_names = set()
+            timestamp_names = {'timestamp', 'time', 't'}
+            
+            # Master (time) channel of each group, whatever it is named
+            masters = self.mdf.masters_db
             
             # Iterate through all groups to get unique channel names
             for group_index, group in enumerate(self.mdf.groups):
                 if hasattr(group, 'channels'):
-                    for channel in group.channels:
+                    for channel_index, channel in enumerate(group.channels):
                         if hasattr(channel, 'name'):
                             channel_name = channel.name
                             # Create unique name for channels that appear in multiple groups
-                            unique_name = f"{channel_name}_group_{group_index}" if channel_name in [ch['name'] for ch in all_channels] else channel_name
-                            all_channels.append({
-                                'name': channel_name,
-                                'unique_name': unique_name,
-                                'group': group_index,
-                                'index': len([ch for ch in group.channels if hasattr(ch, 'name') and ch.name == channel_name])
-                            })
+                            unique_name = f"{channel_name}_group_{group_index}" if channel_name in seen_names else channel_name
+                            seen_names.add(channel_name)
+                            
+                            # Skip timestamp channels as they cause issues
+                            if channel_name.lower() in timestamp_names or masters.get(group_index) == channel_index:
+                                continue
+                            selection.append((channel_name, group_index, channel_index))
+                            unique_names.append(unique_name)
+                            groups.append(group_index)
             
             # If no channels found via groups, fall back to channels_db
-            if not all_channels:
-                channel_names = list(self.mdf.channels_db.keys())
-                all_channels = [{'name': name, 'unique_name': name, 'group': None, 'index': None} for name in channel_names]
+            if not seen_names:
+                channel_names = [name for name in self.mdf.channels_db if name.lower() not in timestamp_names]
+                selection = channel_names
+                unique_names = channel_names
+                groups = [None] * len(channel_names)
+            
+            # Read all channels in one select() call so every data group is decoded once; the
+            # samples stay raw so their conversions run in the worker threads below
+            extracted = self.mdf.select(selection, raw=True, copy_master=False, validate=False)
+            
+            # Keep the first signal's relative timestamps so the time axis needs no extra decode
+            if extracted and len(extracted[0].timestamps) > 0:
+                timestamps = extracted[0].timestamps
+                self._cached_timestamps = np.subtract(timestamps, timestamps[0], dtype=np.float64)
+            
+            # Group the decoded signals by data group for parallel conversion
+            channel_groups = {}
+            for group_index, unique_name, signal in zip(groups, unique_names, extracted):
+                channel_groups.setdefault(group_index, []).append((unique_name, signal))
+            group_order = list(channel_groups)
             
-            # Progress bar for signal extraction
+            # Drop our references to the decoded signals so each group's raw samples are
+            # released as soon as it has been converted, instead of after the whole file
+            del extracted
+            
+            # Progress bar for signal conversion
             progress_bar = st.progress(0)
             status_text = st.empty()
+            status_text.text(f'Extracting signals from {len(group_order)} channel groups')
+            last_update = time.monotonic()
             
-            for i, channel_info in enumerate(all_channels):
-                try:
-                    channel_name = channel_info['name']
-                    unique_name = channel_info['unique_name']
-                    group = channel_info['group']
-                    index = channel_info['index']
-                    
-                    status_text.text(f'Extracting signal: {unique_name}')
-                    
-                    # Skip timestamp channels as they cause issues
-                    if channel_name.lower() in ['timestamp', 'time', 't']:
-                        continue
-                    
-                    # Get signal data with group and index specification if available
-                    try:
-                        if group is not None and index is not None:
-                            signal = self.mdf.get(channel_name, group=group, index=index)
-                        else:
-                            signal = self.mdf.get(channel_name)
-                    except Exception:
-                        # If specific group/index fails, try without
-                        try:
-                            signal = self.mdf.get(channel_name)
-                        except Exception:
-                            continue
+            # select() shares one file handle, so only the numeric post-processing runs in threads;
+            # the NaN kernels release the GIL, so groups are converted on all cores at once
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                futures = {
+                    executor.submit(self._convert_group, channel_groups.pop(group_index)): group_index
+                    for group_index in group_order
+                }
+                converted = {}
+                failures = []
+                for i, future in enumerate(as_completed(futures)):
+                    converted[futures[future]], group_failures = future.result()
+                    failures.extend(group_failures)
                     
-                    if signal is not None and hasattr(signal, 'samples'):
-                        # Convert to numpy array and handle different data types
-                        try:
-                            signal_data = np.array(signal.samples, dtype=np.float64)
-                        except (ValueError, TypeError):
-                            # Try converting with different methods for non-numeric data
-                            try:
-                                signal_data = np.array(signal.samples, dtype=np.float32).astype(np.float64)
-                            except:
-                                continue
-                        
-                        # Skip if signal is empty or invalid
-                        if len(signal_data) == 0:
-                            continue
-                            
-                        # Handle NaN values
-                        if np.isnan(signal_data).all():
-                            continue
-                            
-                        # Replace NaN values with interpolation or zero
-                        if np.isnan(signal_data).any():
-                            # Simple linear interpolation for NaN values
-                            mask = ~np.isnan(signal_data)
-                            if mask.sum() > 1:  # At least 2 valid points for interpolation
-                                indices = np.arange(len(signal_data))
-                                signal_data = np.interp(indices, indices[mask], signal_data[mask])
-                            else:
-                                signal_data = np.nan_to_num(signal_data)
-                        
-                        signals[unique_name] = signal_data
-                        
-                except Exception as e:
-                    st.warning(f"Could not extract signal '{channel_info.get('unique_name', 'unknown')}': {str(e)}")
-                    continue
-                
-                # Update progress
-                progress_bar.progress((i + 1) / len(all_channels))
+                    # Update progress, throttled for files with many groups
+                    now = time.monotonic()
+                    if now - last_update >= PROGRESS_UPDATE_INTERVAL:
+                        progress_bar.progress((i + 1) / len(futures))
+                        last_update = now
+            
+            # Merge in file order so the signal list is stable between runs
+            for group_index in group_order:
+                signals.update(converted.pop(group_index))
             
             # Clear progress indicators
             progress_bar.empty()
             status_text.empty()
             
+            # Streamlit elements can only be created from the script thread, so the
+            # workers' failures are reported here
+            for unique_name, error in failures:
+                st.warning(f"Could not extract signal '{unique_name}': {error}")
+            
             if not signals:
                 raise ValueError("No valid signals found in MF4 file")
                 
@@ -226,8 +451,73 @@ class MF4Processor:
             st.error(f"Error extracting signals: {str(e)}")
             return {}
     
+    def _convert_group(self, group_signals: List[Tuple[str, Any]]) -> Tuple[Dict[str, np.ndarray], List[Tuple[str, str]]]:
+        """Convert the decoded signals of one data group to clean numeric arrays, with the channels that failed"""
+        converted = {}
+        failures = []
+        
+        for unique_name, signal in group_signals:
+            try:
+                signal_data = self._convert_signal(signal)
+            except Exception as e:
+                # One channel that fails to convert shouldn't drop the rest of the file
+                failures.append((unique_name, str(e)))
+                continue
+            
+            if signal_data is not None:
+                converted[unique_name] = signal_data
+        
+        return converted, failures
+    
+    def _convert_signal(self, signal: Any) -> Optional[np.ndarray]:
+        """Convert one decoded signal to a clean numeric array, or None if it has no usable samples"""
+        # Apply the channel's conversion (scale/offset, tables, ...) to the raw samples;
+        # NumPy releases the GIL, so groups convert in parallel
+        signal = signal.physical(copy=False)
+        
+        # Keep the stored dtype (float32, int16, ...) instead of upcasting every sample
+        signal_data = np.ascontiguousarray(signal.samples)
+        if not signal_data.dtype.isnative:
+            # Numba only handles native byte order
+            signal_data = signal_data.astype(signal_data.dtype.newbyteorder('='))
+        if signal_data.dtype.kind == 'f' and signal_data.dtype.itemsize not in (4, 8):
+            # Half (and extended) precision can't be typed by Numba; float32/float64 can
+            signal_data = signal_data.astype(np.float32 if signal_data.dtype.itemsize < 4 else np.float64)
+        elif signal_data.dtype.kind not in 'fiu':
+            try:
+                signal_data = signal_data.astype(np.float32, copy=False)
+            except (ValueError, TypeError):
+                # Non-numeric channels (strings, structures) cannot be analyzed
+                return None
+        
+        # Skip if signal is empty or invalid
+        if len(signal_data) == 0:
+            return None
+        
+        # Handle NaN values with a single counting pass (integer channels cannot hold NaN)
+        if signal_data.dtype.kind == 'f':
+            n_valid = _count_non_nan(signal_data)
+            if n_valid == 0:
+                return None
+            
+            # Replace NaN values with interpolation or zero
+            if n_valid < len(signal_data):
+                if n_valid > 1:  # At least 2 valid points for interpolation
+                    # Fill only the NaN runs in place; decoded buffers may be read-only
+                    if not signal_data.flags.writeable:
+                        signal_data = signal_data.copy()
+                    _fill_nan_runs(signal_data)
+                else:
+                    signal_data = np.nan_to_num(signal_data)
+        
+        return signal_data
+    
     def _create_time_axis(self) -> np.ndarray:
         """Create time axis for signals"""
+        # Reuse the timestamps already decoded during signal extraction
+        if self._cached_timestamps is not None:
+            return self._cached_timestamps
+        
         try:
             # Try to get time information from a non-timestamp signal to avoid conflicts
             channel_names = list(self.mdf.channels_db.keys())
@@ -258,8 +548,8 @@ class MF4Processor:
                 if hasattr(suitable_signal, 'timestamps') and len(suitable_signal.timestamps) > 0:
                     # Use actual timestamps if available
                     timestamps = np.array(suitable_signal.timestamps, dtype=np.float64)
-                    # Convert to relative time (start from 0)
-                    timestamps = timestamps - timestamps[0]
+                    # Convert to relative time (start from 0) in place on the fresh copy
+                    np.subtract(timestamps, timestamps[0], out=timestamps)
                     return timestamps
                 elif hasattr(suitable_signal, 'samples'):
                     # Create synthetic time axis based on sample count
@@ -268,7 +558,7 @@ class MF4Processor:
                     file_info = getattr(self, '_cached_file_info', {'sample_rate': 1.0})
                     sample_rate = file_info.get('sample_rate', 1.0)
                     
-                    return np.linspace(0, sample_count / sample_rate, sample_count)
+                    return np.arange(sample_count, dtype=np.float64) * (1.0 / sample_rate)
             
             # Fallback: create a simple time axis
             return np.array([])
@@ -287,14 +577,18 @@ class MF4Processor:
             if signal is None:
                 return {}
                 
+            # Look the samples up and check them once for all the statistics below
+            samples = getattr(signal, 'samples', None)
+            samples_count = len(samples) if samples is not None else 0
+            
             info = {
                 'name': signal_name,
                 'unit': getattr(signal, 'unit', ''),
                 'comment': getattr(signal, 'comment', ''),
-                'samples_count': len(signal.samples) if hasattr(signal, 'samples') else 0,
-                'min_value': float(np.min(signal.samples)) if hasattr(signal, 'samples') and len(signal.samples) > 0 else 0,
-                'max_value': float(np.max(signal.samples)) if hasattr(signal, 'samples') and len(signal.samples) > 0 else 0,
-                'mean_value': float(np.mean(signal.samples)) if hasattr(signal, 'samples') and len(signal.samples) > 0 else 0,
+                'samples_count': samples_count,
+                'min_value': float(np.min(samples)) if samples_count > 0 else 0,
+                'max_value': float(np.max(samples)) if samples_count > 0 else 0,
+                'mean_value': float(np.mean(samples)) if samples_count > 0 else 0,
             }
             
             return info
@@ -311,3 +605,4 @@ class MF4Processor:
             except:
                 pass
             self.mdf = None
+        self._cached_timestamps = None
@@ -1,8 +1,51 @@
 import numpy as np
-import pandas as pd
-from scipy.signal import find_peaks, peak_widths, peak_prominences
 from typing import Dict, List, Any, Tuple
+from numba import njit
+from joblib import Parallel, delayed
+import threading
+import time
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx, add_script_run_ctx
+
+
+@njit(cache=True)
+def _valid_samples_stats(signal_data, time_data):
+    """Indices of the samples where signal and time are both non-NaN, with the signal mean and std over them"""
+    n_samples = len(signal_data)
+    valid_idx = np.empty(n_samples, dtype=np.int64)
+    n_valid = 0
+    total = 0.0
+    for i in range(n_samples):
+        if not (np.isnan(signal_data[i]) or np.isnan(time_data[i])):
+            valid_idx[n_valid] = i
+            n_valid += 1
+            total += signal_data[i]
+    valid_idx = valid_idx[:n_valid]
+    if n_valid == 0:
+        return valid_idx, 0.0, 0.0
+    
+    mean = total / n_valid
+    squared = 0.0
+    for i in valid_idx:
+        deviation = signal_data[i] - mean
+        squared += deviation * deviation
+    return valid_idx, mean, np.sqrt(squared / n_valid)
+
+
+def _as_kernel_input(values: np.ndarray) -> np.ndarray:
+    """Values as an array Numba can type: native integers and float32/float64 pass through, other dtypes are cast"""
+    dtype = values.dtype
+    if dtype.isnative and (dtype.kind in 'iu' or (dtype.kind == 'f' and dtype.itemsize in (4, 8))):
+        return values
+    # Half precision, bools, byte-swapped or extended-precision samples
+    return values.astype(np.float64 if dtype.kind == 'f' and dtype.itemsize > 8 else np.float32)
+
+
+# Minimum seconds between progress bar updates; each update is a websocket message
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# Compile the kernel at import so the first detection run doesn't pay the JIT latency
+_valid_samples_stats(np.zeros(2), np.zeros(2))
 
 class PeakDetector:
     """Handles peak detection in signal data using scipy algorithms"""
@@ -28,31 +71,25 @@ class PeakDetector:
         # Progress tracking
         progress_bar = st.progress(0)
         status_text = st.empty()
+        status_text.text(f'Detecting peaks in {len(selected_signals)} signals')
+        last_update = time.monotonic()
         
-        for i, signal_name in enumerate(selected_signals):
-            try:
-                status_text.text(f'Detecting peaks in: {signal_name}')
-                
-                signal_data = data['signals'][signal_name]
-                time_data = data['time']
-                
-                # Detect peaks for this signal
-                peak_info = self._detect_signal_peaks(signal_data, time_data, peak_params)
-                results[signal_name] = peak_info
-                
-            except Exception as e:
-                st.warning(f"Peak detection failed for signal '{signal_name}': {str(e)}")
-                # Return empty results for failed signal
-                results[signal_name] = {
-                    'indices': np.array([]),
-                    'heights': np.array([]),
-                    'widths': np.array([]),
-                    'prominences': np.array([]),
-                    'times': np.array([])
-                }
-            
-            # Update progress
-            progress_bar.progress((i + 1) / len(selected_signals))
+        # Signals are independent and find_peaks releases the GIL, so detect them on
+        # worker threads; results stream back in order to drive the progress bar
+        script_ctx = get_script_run_ctx(suppress_warning=True)
+        outputs = Parallel(n_jobs=-1, prefer='threads', return_as='generator')(
+            delayed(self._detect_in_session)(script_ctx, data, signal_name, peak_params)
+            for signal_name in selected_signals
+        )
+        
+        for i, (signal_name, peak_info) in enumerate(zip(selected_signals, outputs)):
+            results[signal_name] = peak_info
+            
+            # Update progress, throttled for long signal lists
+            now = time.monotonic()
+            if now - last_update >= PROGRESS_UPDATE_INTERVAL:
+                progress_bar.progress((i + 1) / len(selected_signals))
+                last_update = now
         
         # Clear progress indicators
         progress_bar.empty()
@@ -60,6 +97,32 @@ class PeakDetector:
         
         return results
     
+    def _detect_in_session(self, script_ctx, data: Dict[str, Any], signal_name: str,
+                           peak_params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Detect peaks of one signal on a worker thread attached to the caller's Streamlit session"""
+        
+        # Without the script context, st.warning calls from worker threads are dropped
+        if script_ctx is not None:
+            add_script_run_ctx(threading.current_thread(), script_ctx)
+        
+        try:
+            signal_data = data['signals'][signal_name]
+            time_data = data['time']
+            
+            # Detect peaks for this signal
+            return self._detect_signal_peaks(signal_data, time_data, peak_params)
+            
+        except Exception as e:
+            st.warning(f"Peak detection failed for signal '{signal_name}': {str(e)}")
+            # Return empty results for failed signal
+            return {
+                'indices': np.array([]),
+                'heights': np.array([]),
+                'widths': np.array([]),
+                'prominences': np.array([]),
+                'times': np.array([])
+            }
+    
     def _detect_signal_peaks(self, signal_data: np.ndarray, time_data: np.ndarray, 
                            peak_params: Dict[str, Any]) -> Dict[str, np.ndarray]:
         """
@@ -73,6 +136,9 @@ class PeakDetector:
         Returns:
             Dictionary with peak information
         """
+        # scipy.signal is imported on first use to keep module import light
+        from scipy.signal import find_peaks, peak_widths, peak_prominences
+        
         try:
             # Validate input data
             if len(signal_data) == 0 or len(time_data) == 0:
@@ -84,17 +150,21 @@ class PeakDetector:
                 signal_data = signal_data[:min_len]
                 time_data = time_data[:min_len]
             
-            # Remove NaN values
-            valid_mask = ~(np.isnan(signal_data) | np.isnan(time_data))
-            if not valid_mask.any():
+            # Remove NaN values and compute the signal mean/std in the same pass
+            signal_data = _as_kernel_input(signal_data)
+            time_data = _as_kernel_input(time_data)
+            valid_indices, signal_mean, signal_std = _valid_samples_stats(signal_data, time_data)
+            if len(valid_indices) == 0:
                 raise ValueError("All data points are NaN")
             
-            signal_clean = signal_data[valid_mask]
-            time_clean = time_data[valid_mask]
+            if len(valid_indices) < len(signal_data):
+                signal_clean = signal_data[valid_indices]
+                time_clean = time_data[valid_indices]
+            else:
+                signal_clean = signal_data
+                time_clean = time_data
             
             # Calculate adaptive height threshold
-            signal_std = np.std(signal_clean)
-            signal_mean = np.mean(signal_clean)
             height_threshold = signal_mean + peak_params['height_threshold'] * signal_std
             
             # Prepare peak detection parameters
@@ -102,7 +172,9 @@ class PeakDetector:
                 'height': height_threshold,
                 'distance': peak_params['distance'],
                 'prominence': peak_params['prominence'] * signal_std,
-                'width': peak_params['width']
+                'width': peak_params['width'],
+                # Optional window (in samples) bounding the prominence base search
+                'wlen': peak_params.get('wlen')
             }
             
             # Find peaks
@@ -121,29 +193,32 @@ class PeakDetector:
             # Extract peak properties
             peak_heights = signal_clean[peak_indices]
             
-            # Calculate peak widths
-            try:
-                widths, width_heights, left_ips, right_ips = peak_widths(
-                    signal_clean, peak_indices, rel_height=0.5
-                )
-            except Exception:
-                # Fallback if width calculation fails
-                widths = np.full(len(peak_indices), np.nan)
-            
-            # Calculate peak prominences
-            try:
-                prominences, left_bases, right_bases = peak_prominences(
-                    signal_clean, peak_indices
-                )
-            except Exception:
-                # Fallback if prominence calculation fails
-                prominences = np.full(len(peak_indices), np.nan)
+            # find_peaks already measured widths (at half prominence) and prominences
+            # for the width/prominence filters; only recompute them if it didn't
+            widths = peak_properties.get('widths')
+            if widths is None:
+                try:
+                    widths, width_heights, left_ips, right_ips = peak_widths(
+                        signal_clean, peak_indices, rel_height=0.5
+                    )
+                except Exception:
+                    # Fallback if width calculation fails
+                    widths = np.full(len(peak_indices), np.nan)
+            
+            prominences = peak_properties.get('prominences')
+            if prominences is None:
+                try:
+                    prominences, left_bases, right_bases = peak_prominences(
+                        signal_clean, peak_indices, wlen=scipy_params['wlen']
+                    )
+                except Exception:
+                    # Fallback if prominence calculation fails
+                    prominences = np.full(len(peak_indices), np.nan)
             
             # Get corresponding times
             peak_times = time_clean[peak_indices]
             
             # Map indices back to original signal indices
-            valid_indices = np.where(valid_mask)[0]
             original_indices = valid_indices[peak_indices]
             
             return {
@@ -177,44 +252,48 @@ class PeakDetector:
             Filtered peak data
         """
         try:
+            # All peak arrays share one length, so a single emptiness check covers them
             if len(peaks_data['indices']) == 0:
                 return peaks_data
             
-            # Initialize mask (all peaks pass initially)
-            mask = np.ones(len(peaks_data['indices']), dtype=bool)
+            # Collect one boolean array per requested criterion
+            conditions = []
             
             # Apply height filter if specified
-            if 'min_height' in criteria and len(peaks_data['heights']) > 0:
-                mask &= peaks_data['heights'] >= criteria['min_height']
+            if 'min_height' in criteria:
+                conditions.append(peaks_data['heights'] >= criteria['min_height'])
             
-            if 'max_height' in criteria and len(peaks_data['heights']) > 0:
-                mask &= peaks_data['heights'] <= criteria['max_height']
+            if 'max_height' in criteria:
+                conditions.append(peaks_data['heights'] <= criteria['max_height'])
             
             # Apply width filter if specified
-            if 'min_width' in criteria and len(peaks_data['widths']) > 0:
-                mask &= peaks_data['widths'] >= criteria['min_width']
+            if 'min_width' in criteria:
+                conditions.append(peaks_data['widths'] >= criteria['min_width'])
             
-            if 'max_width' in criteria and len(peaks_data['widths']) > 0:
-                mask &= peaks_data['widths'] <= criteria['max_width']
+            if 'max_width' in criteria:
+                conditions.append(peaks_data['widths'] <= criteria['max_width'])
             
             # Apply prominence filter if specified
-            if 'min_prominence' in criteria and len(peaks_data['prominences']) > 0:
-                mask &= peaks_data['prominences'] >= criteria['min_prominence']
+            if 'min_prominence' in criteria:
+                conditions.append(peaks_data['prominences'] >= criteria['min_prominence'])
             
             # Apply time range filter if specified
-            if 'time_range' in criteria and len(peaks_data['times']) > 0:
+            if 'time_range' in criteria:
                 time_min, time_max = criteria['time_range']
-                mask &= (peaks_data['times'] >= time_min) & (peaks_data['times'] <= time_max)
+                conditions.append(peaks_data['times'] >= time_min)
+                conditions.append(peaks_data['times'] <= time_max)
             
-            # Apply the mask to all arrays
-            filtered_data = {}
-            for key, values in peaks_data.items():
-                if len(values) > 0:
-                    filtered_data[key] = values[mask]
-                else:
-                    filtered_data[key] = values
+            # No criteria means every peak passes
+            if not conditions:
+                return peaks_data
             
-            return filtered_data
+            # AND the conditions in place into the first one, without an all-True seed array
+            mask = conditions[0]
+            for condition in conditions[1:]:
+                np.logical_and(mask, condition, out=mask)
+            
+            # Apply the mask to all arrays
+            return {key: values[mask] for key, values in peaks_data.items()}
             
         except Exception as e:
             st.warning(f"Peak filtering failed: {str(e)}")
@@ -247,40 +326,13 @@ class PeakDetector:
             
             stats['count'] = len(peaks_data['indices'])
             
-            # Height statistics
-            if len(peaks_data['heights']) > 0:
-                stats['mean_height'] = float(np.mean(peaks_data['heights']))
-                stats['std_height'] = float(np.std(peaks_data['heights']))
-                stats['min_height'] = float(np.min(peaks_data['heights']))
-                stats['max_height'] = float(np.max(peaks_data['heights']))
-            else:
-                stats.update({'mean_height': 0.0, 'std_height': 0.0, 'min_height': 0.0, 'max_height': 0.0})
-            
-            # Width statistics
-            if len(peaks_data['widths']) > 0 and not np.isnan(peaks_data['widths']).all():
-                valid_widths = peaks_data['widths'][~np.isnan(peaks_data['widths'])]
-                if len(valid_widths) > 0:
-                    stats['mean_width'] = float(np.mean(valid_widths))
-                    stats['std_width'] = float(np.std(valid_widths))
-                    stats['min_width'] = float(np.min(valid_widths))
-                    stats['max_width'] = float(np.max(valid_widths))
-                else:
-                    stats.update({'mean_width': 0.0, 'std_width': 0.0, 'min_width': 0.0, 'max_width': 0.0})
-            else:
-                stats.update({'mean_width': 0.0, 'std_width': 0.0, 'min_width': 0.0, 'max_width': 0.0})
-            
-            # Prominence statistics
-            if len(peaks_data['prominences']) > 0 and not np.isnan(peaks_data['prominences']).all():
-                valid_prominences = peaks_data['prominences'][~np.isnan(peaks_data['prominences'])]
-                if len(valid_prominences) > 0:
-                    stats['mean_prominence'] = float(np.mean(valid_prominences))
-                    stats['std_prominence'] = float(np.std(valid_prominences))
-                    stats['min_prominence'] = float(np.min(valid_prominences))
-                    stats['max_prominence'] = float(np.max(valid_prominences))
-                else:
-                    stats.update({'mean_prominence': 0.0, 'std_prominence': 0.0, 'min_prominence': 0.0, 'max_prominence': 0.0})
-            else:
-                stats.update({'mean_prominence': 0.0, 'std_prominence': 0.0, 'min_prominence': 0.0, 'max_prominence': 0.0})
+            # Height, width and prominence statistics over the non-NaN values
+            for key, label in (('heights', 'height'), ('widths', 'width'), ('prominences', 'prominence')):
+                mean, std, minimum, maximum = self._valid_value_statistics(peaks_data[key])
+                stats[f'mean_{label}'] = mean
+                stats[f'std_{label}'] = std
+                stats[f'min_{label}'] = minimum
+                stats[f'max_{label}'] = maximum
             
             # Peak rate (peaks per unit time)
             if len(peaks_data['times']) > 0:
@@ -298,3 +350,23 @@ class PeakDetector:
             st.warning(f"Peak statistics calculation failed: {str(e)}")
             return {'count': 0, 'mean_height': 0.0, 'std_height': 0.0, 'mean_width': 0.0, 
                    'std_width': 0.0, 'mean_prominence': 0.0, 'std_prominence': 0.0, 'peak_rate': 0.0}
+    
+    def _valid_value_statistics(self, values: np.ndarray) -> Tuple[float, float, float, float]:
+        """
+        Calculate mean, standard deviation, minimum and maximum of the non-NaN values
+        
+        Args:
+            values: Peak property values, possibly containing NaN
+            
+        Returns:
+            Tuple of (mean, std, min, max), all 0.0 when there are no valid values
+        """
+        valid = values[~np.isnan(values)]
+        if len(valid) == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        
+        # Reuse the mean for the standard deviation instead of letting np.std recompute it
+        mean = np.mean(valid)
+        deviation = valid - mean
+        std = np.sqrt(np.dot(deviation, deviation) / len(valid))
+        return float(mean), float(std), float(np.min(valid)), float(np.max(valid))
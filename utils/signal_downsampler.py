@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Tuple
+from numba import njit
+
+
+@njit(cache=True)
+def _lttb_indices(x, y, n_out):
+    """Indices of the samples kept by Largest-Triangle-Three-Buckets downsampling"""
+    n_samples = len(x)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[n_out - 1] = n_samples - 1
+    
+    # Interior samples are split into n_out - 2 buckets; one sample is kept per bucket
+    bucket_size = (n_samples - 2) / (n_out - 2)
+    previous = 0
+    for bucket in range(n_out - 2):
+        # Average point of the next bucket (the last bucket looks at the final sample)
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n_samples)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(next_start, next_end):
+            avg_x += x[j]
+            avg_y += y[j]
+        avg_x /= next_end - next_start
+        avg_y /= next_end - next_start
+        
+        # Keep the sample forming the largest triangle with the previous kept sample
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        max_area = -1.0
+        chosen = start
+        for j in range(start, end):
+            area = abs((x[previous] - avg_x) * (y[j] - y[previous])
+                       - (x[previous] - x[j]) * (avg_y - y[previous]))
+            if area > max_area:
+                max_area = area
+                chosen = j
+        kept[bucket + 1] = chosen
+        previous = chosen
+    
+    return kept
+
+
+# Compile the kernel at import so the first chart doesn't pay the JIT latency
+_lttb_indices(np.arange(4.0), np.zeros(4), 3)
+
+class SignalDownsampler:
+    """Reduces signal traces to a displayable number of points while keeping their shape"""
+    
+    def __init__(self, max_points: int = 4000):
+        self.max_points = max_points
+    
+    def downsample(self, time_data: np.ndarray, signal_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Downsample a signal trace for plotting using Largest-Triangle-Three-Buckets
+        
+        Args:
+            time_data: Time values
+            signal_data: Signal values
+        
+        Returns:
+            Tuple of (time, values) with at most max_points samples
+        """
+        # Plot only the samples that have a time value, as the full trace did
+        n_samples = min(len(time_data), len(signal_data))
+        time_data = time_data[:n_samples]
+        signal_data = signal_data[:n_samples]
+        
+        if n_samples <= self.max_points or self.max_points < 3:
+            return time_data, signal_data
+        
+        kept = _lttb_indices(
+            np.ascontiguousarray(time_data, dtype=np.float64),
+            np.ascontiguousarray(signal_data, dtype=np.float64),
+            self.max_points
+        )
+        return time_data[kept], signal_data[kept]